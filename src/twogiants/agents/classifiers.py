@@ -0,0 +1,149 @@
+"""Local intent classifiers - Answer obvious routing decisions without calling Gemini."""
+
+from pathlib import Path
+from typing import Optional, Tuple
+
+# Label order of the classifiers' outputs (the training script uses it too)
+LABELS = ("conversation", "executor", "research")
+
+# Exported model (model.onnx + tokenizer.json), built by scripts/train_router.py onnx
+MODEL_DIR = Path.home() / ".2giants" / "router_model"
+
+# Serialized scikit-learn pipeline (HashingVectorizer + LogisticRegression),
+# built by scripts/train_router.py fastpath
+FASTPATH_MODEL = Path.home() / ".2giants" / "router_fastpath.joblib"
+
+
+class FastPathClassifier:
+    """Bag-of-words logistic regression, a sparse dot product per input.
+
+    Requires scikit-learn and joblib (``local-router`` extra).
+    """
+
+    def __init__(self, pipeline):
+        """Wrap a fitted pipeline.
+
+        Args:
+            pipeline: Fitted scikit-learn pipeline exposing predict_proba()
+        
+        Raises:
+            ValueError: If the pipeline's classes aren't the route labels
+        """
+        self._labels = [str(label) for label in pipeline.classes_]
+        if sorted(self._labels) != sorted(LABELS):
+            raise ValueError(f"Pipeline classes {self._labels} don't match {list(LABELS)}")
+        
+        self.pipeline = pipeline
+
+    @classmethod
+    def load(cls, model_path: Path = FASTPATH_MODEL) -> Optional["FastPathClassifier"]:
+        """Load the classifier if the model is installed and its dependencies are available.
+
+        Args:
+            model_path: Path to the joblib-serialized pipeline
+
+        Returns:
+            The classifier, or None if it can't be used
+        """
+        if not model_path.is_file():
+            return None
+
+        try:
+            import joblib
+        except ImportError:
+            return None
+
+        return cls(joblib.load(model_path))
+
+    def classify(self, text: str) -> Tuple[str, float]:
+        """Classify text.
+
+        Args:
+            text: User input to classify
+
+        Returns:
+            Tuple of (label, confidence) where confidence is the predicted probability
+        """
+        probs = self.pipeline.predict_proba([text])[0]
+        best = int(probs.argmax())
+        return self._labels[best], float(probs[best])
+
+
+class OnnxIntentClassifier:
+    """Small quantized (int8) BERT-class intent classifier running on CPU.
+
+    Requires the optional dependencies from the ``local-router`` extra
+    (onnxruntime, tokenizers, numpy).
+    """
+
+    def __init__(self, model_path: Path, tokenizer_path: Path, max_length: int = 128):
+        """Load the ONNX session and the fast tokenizer once.
+
+        Args:
+            model_path: Path to the quantized ONNX model
+            tokenizer_path: Path to the tokenizer.json of the model
+            max_length: Maximum number of tokens fed to the model
+        """
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        self.session = ort.InferenceSession(
+            str(model_path),
+            providers=["CPUExecutionProvider"]
+        )
+        self.tokenizer = Tokenizer.from_file(str(tokenizer_path))
+        self.tokenizer.enable_truncation(max_length=max_length)
+        self._input_names = {node.name for node in self.session.get_inputs()}
+        
+        num_labels = self.session.get_outputs()[0].shape[-1]
+        if isinstance(num_labels, int) and num_labels != len(LABELS):
+            raise ValueError(f"Model has {num_labels} outputs, expected {len(LABELS)} ({', '.join(LABELS)})")
+
+    @classmethod
+    def load(cls, model_dir: Path = MODEL_DIR) -> Optional["OnnxIntentClassifier"]:
+        """Load the classifier if the model is installed and its dependencies are available.
+
+        Args:
+            model_dir: Directory containing model.onnx and tokenizer.json
+
+        Returns:
+            The classifier, or None if it can't be used
+        """
+        model_path = model_dir / "model.onnx"
+        tokenizer_path = model_dir / "tokenizer.json"
+
+        if not (model_path.is_file() and tokenizer_path.is_file()):
+            return None
+
+        try:
+            return cls(model_path, tokenizer_path)
+        except ImportError:
+            return None
+
+    def classify(self, text: str) -> Tuple[str, float]:
+        """Classify text.
+
+        Args:
+            text: User input to classify
+
+        Returns:
+            Tuple of (label, confidence) where confidence is the softmax probability
+        """
+        import numpy as np
+
+        encoding = self.tokenizer.encode(text)
+        feeds = {
+            "input_ids": np.array([encoding.ids], dtype=np.int64),
+            "attention_mask": np.array([encoding.attention_mask], dtype=np.int64),
+        }
+        if "token_type_ids" in self._input_names:
+            feeds["token_type_ids"] = np.array([encoding.type_ids], dtype=np.int64)
+
+        logits = self.session.run(None, feeds)[0][0]
+
+        # Softmax (shifted for numerical stability)
+        exps = np.exp(logits - logits.max())
+        probs = exps / exps.sum()
+
+        best = int(probs.argmax())
+        return LABELS[best], float(probs[best])
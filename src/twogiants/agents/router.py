@@ -1,30 +1,132 @@
 """Router Agent - Classifies user intent and routes to specialized agents."""
 
-from langchain_google_genai import ChatGoogleGenerativeAI
-from typing import Literal
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Literal, Optional
+import hashlib
+import json
 import os
+import re
+import time
+
+from .classifiers import FastPathClassifier, OnnxIntentClassifier
+
+if TYPE_CHECKING:
+    from google import genai
+    from twogiants.llm import Messages
 
 RouteType = Literal["conversation", "executor", "research"]
 
+# Classifications are cached in memory (LRU) and persisted between runs
+CACHE_FILE = Path.home() / ".2giants" / "route_cache.json"
+CACHE_SIZE = 1024
+
+# Fast path: obvious inputs are classified without any model (checked in this order)
+EXEC_VERBS = re.compile(
+    r"^\s*(deploy|run|create|delete|commit|install|build|push|kill|restart|mkdir|rm|cp|mv)\b",
+    re.IGNORECASE
+)
+RESEARCH_TRIGGERS = re.compile(
+    r"\b(what'?s new|latest|search|find .+ (docs?|documentation)|newest)\b",
+    re.IGNORECASE
+)
+CONVERSATION_TRIGGERS = re.compile(
+    r"^\s*(hi|hello|hey|how|why|what is|explain|thanks)\b",
+    re.IGNORECASE
+)
+
+# Static part of the classification prompt (rules + examples)
+ROUTER_INSTRUCTIONS = """Classify the user input into ONE category.
+
+Categories:
+- "conversation" : greetings, questions, explanations, casual chat, how-to questions
+- "executor" : commands to execute, file operations, deployments, code changes, actions
+- "research" : needs web search, documentation lookup, latest information, "what's new"
+
+Rules:
+- Return ONLY the category name, nothing else
+- If unsure, choose "conversation" (safest)
+- "executor" only if there's a clear ACTION verb (run, deploy, create, delete, etc.)
+- "research" only if needs current/external information
+
+Examples:
+"hello" → conversation
+"how are you?" → conversation
+"explain git rebase" → conversation
+"what is Docker?" → conversation
+
+"deploy to production" → executor
+"run tests" → executor
+"create a new file" → executor
+"commit my changes" → executor
+"delete old logs" → executor
+
+"what's new in Python 3.13?" → research
+"find React documentation" → research
+"what's the latest Next.js version?" → research
+"search for async/await best practices" → research"""
+
+# Variable part of the classification prompt, around the user input
+_PROMPT_PREFIX = 'Now classify: "'
+_PROMPT_SUFFIX = '"\n\nAnswer (one word only):'
+
+# Lifetime of the server-side cache of ROUTER_INSTRUCTIONS
+PROMPT_CACHE_TTL = 3600
+
+# Gemini model answering the classifications the local layers can't
+ROUTER_MODEL = "gemini-2.5-flash"
+
+# Mixed into cache keys: persisted routes only count for the model and prompt that produced them
+_CACHE_VERSION = hashlib.sha256(
+    "\0".join((ROUTER_MODEL, ROUTER_INSTRUCTIONS, _PROMPT_PREFIX, _PROMPT_SUFFIX)).encode()
+).digest()
+
+# Below these probabilities the local classifiers defer to the next layer
+FASTPATH_CONFIDENCE_THRESHOLD = 0.85
+LOCAL_CONFIDENCE_THRESHOLD = 0.7
+
 
 class RouterAgent:
     """Routes user commands to the appropriate specialized agent."""
     
-    def __init__(self, api_key: str, debug: bool = False):
+    def __init__(
+        self,
+        api_key: str,
+        debug: bool = False,
+        use_cache: bool = True,
+        client: Optional["genai.Client"] = None
+    ):
         """Initialize Router Agent.
         
         Args:
             api_key: Google API key for Gemini
             debug: Enable debug logging
+            use_cache: Reuse previous classifications of identical inputs
+            client: Existing Gemini client to share (one is created if omitted)
         """
         self.debug = debug
+        self.use_cache = use_cache
+        self._cache: OrderedDict[str, RouteType] = self._load_cache() if use_cache else OrderedDict()
+        self._cache_dirty = False
+        
+        # Optional local classifiers (µs then ~ms on CPU), Gemini is only the fallback
+        self._fastpath = self._load_classifier(FastPathClassifier)
+        self._classifier = self._load_classifier(OnnxIntentClassifier)
         
         # Use Gemini Flash for fast routing
-        self.llm = ChatGoogleGenerativeAI(
-            model="gemini-2.5-flash",
-            temperature=0.1,  # Low temperature for consistent classification
-            api_key=api_key
+        from twogiants.llm import CACHE_MIN_CHARS, GeminiLLM, create_client
+        
+        self.llm = GeminiLLM(
+            client if client is not None else create_client(api_key),
+            model=ROUTER_MODEL,
+            temperature=0.1  # Low temperature for consistent classification
         )
+        
+        # Server-side cache of the static instructions (created on first use), only
+        # attempted when they reach the model's minimum cacheable size
+        self._instructions_cache: Optional[str] = None
+        self._instructions_cache_expiry = 0.0
+        self._instructions_cache_failed = len(ROUTER_INSTRUCTIONS) < CACHE_MIN_CHARS
     
     def route(self, user_input: str) -> RouteType:
         """Classify user input and route to appropriate agent.
@@ -36,32 +138,264 @@ class RouterAgent:
             Route type: "conversation", "executor", or "research"
         """
         
+        route = self.quick_route(user_input)
+        if route is not None:
+            return route
+        
         prompt = self._build_classification_prompt(user_input)
         
         try:
-            response = self.llm.invoke(prompt)
-            route = response.content.strip().lower()
-            
-            # Validate response
-            if route in ["conversation", "executor", "research"]:
+            cache_name = self._cached_instructions()
+            response = self.llm.invoke(
+                self._prompt_messages(prompt, cache_name), cached_content=cache_name
+            )
+            route = self._parse_response(user_input, response)
+            self._save_cache()
+            return route
+        
+        except Exception as e:
+            if self.debug:
+                print(f"[Router] Error: {e}, defaulting to conversation")
+            # The cached instructions may be gone server-side, recreate them next time
+            self._instructions_cache = None
+            # On error, default to conversation (safest)
+            return "conversation"
+    
+    async def aroute(self, user_input: str) -> RouteType:
+        """Async version of route().
+        
+        Args:
+            user_input: User's command or question
+        
+        Returns:
+            Route type: "conversation", "executor", or "research"
+        """
+        
+        route = self.quick_route(user_input)
+        if route is not None:
+            return route
+        
+        return await self.aclassify(user_input)
+    
+    def quick_route(self, user_input: str) -> Optional[RouteType]:
+        """Classify user input without calling Gemini (keywords, cache, local classifiers).
+        
+        Args:
+            user_input: User's command or question
+        
+        Returns:
+            Route type, or None if Gemini must decide
+        """
+        
+        route = self._match_keywords(user_input)
+        if route is not None:
+            if self.debug:
+                print(f"[Router] '{user_input}' → {route} (keywords)")
+            return route
+        
+        # Identical inputs always get the same classification (fixed prompt)
+        if self.use_cache:
+            cache_key = self._cache_key(user_input)
+            if cache_key in self._cache:
+                self._cache.move_to_end(cache_key)
+                route = self._cache[cache_key]
                 if self.debug:
-                    print(f"[Router] '{user_input}' → {route}")
+                    print(f"[Router] '{user_input}' → {route} (cached)")
                 return route
-            else:
-                # Invalid response, default to conversation
+        
+        for classifier, threshold in (
+            (self._fastpath, FASTPATH_CONFIDENCE_THRESHOLD),
+            (self._classifier, LOCAL_CONFIDENCE_THRESHOLD),
+        ):
+            if classifier is None:
+                continue
+            
+            name = type(classifier).__name__
+            try:
+                route, confidence = classifier.classify(user_input)
+                if confidence >= threshold:
+                    if self.debug:
+                        print(f"[Router] '{user_input}' → {route} ({name}, {confidence:.2f})")
+                    return route
+                if self.debug:
+                    print(f"[Router] Low {name} confidence ({confidence:.2f})")
+            except Exception as e:
                 if self.debug:
-                    print(f"[Router] Invalid response '{route}', defaulting to conversation")
-                return "conversation"
+                    print(f"[Router] {name} error: {e}")
+        
+        return None
+    
+    @staticmethod
+    def _match_keywords(user_input: str) -> Optional[RouteType]:
+        """Classify obvious inputs with regular expressions.
+        
+        Args:
+            user_input: User's command or question
+        
+        Returns:
+            Route type, or None if the input is ambiguous
+        """
+        if EXEC_VERBS.search(user_input):
+            return "executor"
+        if RESEARCH_TRIGGERS.search(user_input):
+            return "research"
+        if CONVERSATION_TRIGGERS.search(user_input):
+            return "conversation"
+        return None
+    
+    async def aclassify(self, user_input: str) -> RouteType:
+        """Classify user input with Gemini (skips the cache and local classifier).
+        
+        Args:
+            user_input: User's command or question
+        
+        Returns:
+            Route type: "conversation", "executor", or "research"
+        """
+        
+        prompt = self._build_classification_prompt(user_input)
+        
+        try:
+            cache_name = await self._acached_instructions()
+            response = await self.llm.ainvoke(
+                self._prompt_messages(prompt, cache_name), cached_content=cache_name
+            )
+            route = self._parse_response(user_input, response)
+            self._save_cache()
+            return route
         
         except Exception as e:
             if self.debug:
                 print(f"[Router] Error: {e}, defaulting to conversation")
+            # The cached instructions may be gone server-side, recreate them next time
+            self._instructions_cache = None
             # On error, default to conversation (safest)
             return "conversation"
     
+    async def aclassify_batch(self, user_inputs: List[str]) -> List[RouteType]:
+        """Classify several inputs with one batched Gemini call.
+        
+        Args:
+            user_inputs: User's commands or questions
+        
+        Returns:
+            One route per input, in the same order
+        """
+        
+        cache_name = await self._acached_instructions()
+        prompts = [
+            self._prompt_messages(self._build_classification_prompt(user_input), cache_name)
+            for user_input in user_inputs
+        ]
+        responses = await self.llm.abatch(prompts, return_exceptions=True, cached_content=cache_name)
+        
+        routes: List[RouteType] = []
+        for user_input, response in zip(user_inputs, responses):
+            if isinstance(response, Exception):
+                if self.debug:
+                    print(f"[Router] Error: {response}, defaulting to conversation")
+                routes.append("conversation")
+            else:
+                routes.append(self._parse_response(user_input, response))
+        
+        # One write for the whole batch
+        self._save_cache()
+        return routes
+    
+    def _parse_response(self, user_input: str, content: str) -> RouteType:
+        """Validate Gemini's answer and cache it (in memory, see _save_cache()).
+        
+        Args:
+            user_input: The classified input
+            content: Raw text answered by Gemini
+        
+        Returns:
+            The route, or "conversation" if the answer is invalid
+        """
+        # Only the start matters: tolerates quotes, trailing punctuation or extra words
+        answer = content[:16].lstrip(" \t\r\n\"'`*").lower()
+        
+        if answer.startswith("conv"):
+            route = "conversation"
+        elif answer.startswith("exec"):
+            route = "executor"
+        elif answer.startswith("res"):
+            route = "research"
+        else:
+            # Invalid response, default to conversation
+            if self.debug:
+                print(f"[Router] Invalid response '{content.strip()}', defaulting to conversation")
+            return "conversation"
+        
+        if self.debug:
+            print(f"[Router] '{user_input}' → {route}")
+        if self.use_cache:
+            self._remember(self._cache_key(user_input), route)
+        return route
+    
+    def _load_classifier(self, classifier_class):
+        """Load an optional local classifier if it is installed."""
+        try:
+            classifier = classifier_class.load()
+        except Exception as e:
+            if self.debug:
+                print(f"[Router] Could not load {classifier_class.__name__}: {e}")
+            return None
+        
+        if classifier is not None and self.debug:
+            print(f"[Router] {classifier_class.__name__} loaded")
+        return classifier
+    
+    @staticmethod
+    def _cache_key(user_input: str) -> str:
+        """Build the cache key for an input (case and surrounding whitespace ignored)."""
+        return hashlib.sha256(_CACHE_VERSION + user_input.strip().lower().encode()).hexdigest()
+    
+    def _load_cache(self) -> "OrderedDict[str, RouteType]":
+        """Load persisted classifications, ignoring a missing or corrupt file."""
+        try:
+            data = json.loads(CACHE_FILE.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return OrderedDict()
+        
+        if not isinstance(data, dict):
+            return OrderedDict()
+        
+        cache = OrderedDict(
+            (key, route) for key, route in data.items()
+            if route in ("conversation", "executor", "research")
+        )
+        while len(cache) > CACHE_SIZE:
+            cache.popitem(last=False)
+        return cache
+    
+    def _remember(self, cache_key: str, route: RouteType) -> None:
+        """Remember a classification in memory."""
+        self._cache[cache_key] = route
+        self._cache.move_to_end(cache_key)
+        while len(self._cache) > CACHE_SIZE:
+            self._cache.popitem(last=False)
+        self._cache_dirty = True
+    
+    def _save_cache(self) -> None:
+        """Persist the cache to disk if classifications were added since the last save."""
+        if not self._cache_dirty:
+            return
+        self._cache_dirty = False
+        
+        try:
+            CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+            CACHE_FILE.write_text(json.dumps(self._cache), encoding="utf-8")
+        except OSError as e:
+            if self.debug:
+                print(f"[Router] Could not save route cache: {e}")
+    
     def _build_classification_prompt(self, user_input: str) -> str:
         """Build the classification prompt for Gemini.
         
+        Only the variable part: the rules and examples are sent as system
+        instruction (ROUTER_INSTRUCTIONS), cached server-side when possible.
+        
         Args:
             user_input: User's input to classify
         
@@ -69,41 +403,61 @@ class RouterAgent:
             Formatted prompt for classification
         """
         
-        return f"""Classify this user input into ONE category.
-
-Input: "{user_input}"
-
-Categories:
-- "conversation" : greetings, questions, explanations, casual chat, how-to questions
-- "executor" : commands to execute, file operations, deployments, code changes, actions
-- "research" : needs web search, documentation lookup, latest information, "what's new"
-
-Rules:
-- Return ONLY the category name, nothing else
-- If unsure, choose "conversation" (safest)
-- "executor" only if there's a clear ACTION verb (run, deploy, create, delete, etc.)
-- "research" only if needs current/external information
-
-Examples:
-"hello" → conversation
-"how are you?" → conversation
-"explain git rebase" → conversation
-"what is Docker?" → conversation
-
-"deploy to production" → executor
-"run tests" → executor
-"create a new file" → executor
-"commit my changes" → executor
-"delete old logs" → executor
-
-"what's new in Python 3.13?" → research
-"find React documentation" → research
-"what's the latest Next.js version?" → research
-"search for async/await best practices" → research
-
-Now classify: "{user_input}"
-
-Answer (one word only):"""
+        return _PROMPT_PREFIX + user_input + _PROMPT_SUFFIX
+    
+    def _prompt_messages(self, prompt: str, cache_name: Optional[str]) -> "Messages":
+        """Attach the router instructions to a prompt unless they are cached."""
+        if cache_name is not None:
+            return prompt
+        return [("system", ROUTER_INSTRUCTIONS), ("user", prompt)]
+    
+    def _cached_instructions(self) -> Optional[str]:
+        """Get the cached content holding ROUTER_INSTRUCTIONS, creating it if needed.
+        
+        Returns:
+            Cached content name, or None if caching is unavailable
+        """
+        if self._instructions_cache_failed:
+            return None
+        
+        if self._instructions_cache is None or time.monotonic() >= self._instructions_cache_expiry:
+            try:
+                name = self.llm.create_cache(ROUTER_INSTRUCTIONS, PROMPT_CACHE_TTL)
+            except Exception as e:
+                self._disable_instructions_cache(e)
+                return None
+            self._remember_instructions_cache(name)
+        
+        return self._instructions_cache
+    
+    async def _acached_instructions(self) -> Optional[str]:
+        """Async version of _cached_instructions()."""
+        if self._instructions_cache_failed:
+            return None
+        
+        if self._instructions_cache is None or time.monotonic() >= self._instructions_cache_expiry:
+            try:
+                name = await self.llm.acreate_cache(ROUTER_INSTRUCTIONS, PROMPT_CACHE_TTL)
+            except Exception as e:
+                self._disable_instructions_cache(e)
+                return None
+            self._remember_instructions_cache(name)
+        
+        return self._instructions_cache
+    
+    def _remember_instructions_cache(self, name: str) -> None:
+        """Store a new cached content name, refreshed a minute before it expires."""
+        self._instructions_cache = name
+        self._instructions_cache_expiry = time.monotonic() + PROMPT_CACHE_TTL - 60
+        if self.debug:
+            print(f"[Router] Instructions cached as {name}")
+    
+    def _disable_instructions_cache(self, error: Exception) -> None:
+        """Stop trying to cache the instructions (e.g. below the model's minimum size)."""
+        self._instructions_cache = None
+        self._instructions_cache_failed = True
+        if self.debug:
+            print(f"[Router] Prompt caching unavailable: {error}")
     
     def get_route_description(self, route: RouteType) -> str:
         """Get human-readable description of a route.
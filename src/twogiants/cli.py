@@ -2,13 +2,17 @@
 
 import typer
 from rich.console import Console
-from rich.panel import Panel
-from prompt_toolkit import PromptSession
-from prompt_toolkit.history import FileHistory
-from typing import Optional
+from typing import TYPE_CHECKING, List, Optional
+import asyncio
+import concurrent.futures
 import os
+import threading
+from collections import deque
 from pathlib import Path
 
+if TYPE_CHECKING:
+    from twogiants.main import TwoGiants
+
 # Créer l'app avec invoke_without_command=True
 app = typer.Typer(
     name="2g",
@@ -23,6 +27,28 @@ console = Console()
 CONFIG_DIR = Path.home() / ".2giants"
 CONFIG_DIR.mkdir(exist_ok=True)
 
+# One event loop for the whole session, so async HTTP clients stay usable across
+# commands. It runs in a background thread so I/O can progress while the REPL waits.
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+# Special commands of interactive mode
+_EXIT_CMDS = frozenset({"exit", "quit", "q", "bye"})
+_HELP_CMDS = frozenset({"help", "?"})
+_CLEAR_CMDS = frozenset({"clear", "cls"})
+_MAX_CMD_LEN = max(len(cmd) for cmd in _EXIT_CMDS | _HELP_CMDS | _CLEAR_CMDS)
+
+# First line of an input whose other lines are separate commands
+_BATCH_CMD = "batch"
+
+# Max commands sent together by the batch command
+MAX_BATCH = 8
+
+# The history file is cut down to its most recent lines at startup
+HISTORY_MAX_LINES = 10_000
+
+# Appends entered commands to the history file off the prompt thread
+_history_writer = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="2giants-history")
+
 
 @app.callback()
 def main(
@@ -31,7 +57,8 @@ def main(
     dry_run: bool = typer.Option(False, "--dry-run", help="Show plan without executing"),
     safe_mode: bool = typer.Option(True, "--safe/--unsafe", help="Enable safety checks"),
     session: Optional[str] = typer.Option(None, "--session", "-s", help="Session ID"),
-    debug: bool = typer.Option(False, "--debug", help="Enable debug mode")
+    debug: bool = typer.Option(False, "--debug", help="Enable debug mode"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Bypass the routing cache")
 ):
     """2Giants CLI - Execute commands or start interactive mode.
     
@@ -48,7 +75,9 @@ def main(
     
     # Si pas de prompt → Mode interactif
     if prompt is None:
-        start_interactive_mode(safe_mode=safe_mode, session=session, debug=debug)
+        start_interactive_mode(
+            safe_mode=safe_mode, session=session, debug=debug, use_cache=not no_cache
+        )
         return
     
     # Mode one-shot
@@ -57,17 +86,22 @@ def main(
         dry_run=dry_run,
         safe_mode=safe_mode,
         session=session,
-        debug=debug
+        debug=debug,
+        use_cache=not no_cache
     )
 
 
 def start_interactive_mode(
     safe_mode: bool = True,
     session: Optional[str] = None,
-    debug: bool = False
-):
+    debug: bool = False,
+    use_cache: bool = True
+) -> None:
     """Start the interactive loop mode."""
     
+    # Imported here so one-shot commands don't pay for prompt_toolkit
+    from prompt_toolkit import PromptSession
+    
     # ASCII Art Banner
     banner = """
 ╔══════════════════════════════════════════════════════════╗
@@ -101,10 +135,14 @@ def start_interactive_mode(
     console.print("─" * 60)
     console.print()
     
+    # Build the client once (reused by every command) and connect while the user types
+    warm_cli = _submit(_warmup(safe_mode=safe_mode, debug=debug, use_cache=use_cache))
+    
     # Setup prompt with history
     history_file = CONFIG_DIR / "history"
+    _trim_history(history_file)
     prompt_session = PromptSession(
-        history=FileHistory(str(history_file))
+        history=_load_history(history_file)
     )
     
     # Interactive loop
@@ -120,29 +158,54 @@ def start_interactive_mode(
             if not user_input:
                 continue
             
+            # Special commands are short, real prompts skip the lowercasing
+            command = user_input.lower() if len(user_input) <= _MAX_CMD_LEN else None
+            
             # Check for exit commands
-            if user_input.lower() in ['exit', 'quit', 'q', 'bye']:
+            if command in _EXIT_CMDS:
                 console.print("\n[yellow]👋 Goodbye! Thanks for using 2Giants![/yellow]\n")
                 break
             
             # Check for help
-            if user_input.lower() in ['help', '?']:
+            if command in _HELP_CMDS:
                 show_help()
                 continue
             
             # Check for clear
-            if user_input.lower() in ['clear', 'cls']:
+            if command in _CLEAR_CMDS:
                 console.clear()
                 continue
             
+            # "batch" followed by one command per line → batch them
+            # (other multi-line input, e.g. pasted code, stays a single prompt)
+            first_line, _, rest = user_input.partition("\n")
+            if first_line.strip().lower() == _BATCH_CMD:
+                lines = [line.strip() for line in rest.splitlines() if line.strip()]
+                if not lines:
+                    console.print("[yellow]Usage: batch, then one command per line[/yellow]")
+                    continue
+                
+                console.print()  # Blank line
+                execute_batch(
+                    cli=warm_cli.result(),
+                    prompts=lines,
+                    safe_mode=safe_mode,
+                    session=session,
+                    debug=debug,
+                    use_cache=use_cache
+                )
+                continue
+            
             # Execute command
             console.print()  # Blank line
             execute_command(
+                cli=warm_cli.result(),
                 prompt=user_input,
                 dry_run=False,
                 safe_mode=safe_mode,
                 session=session,
-                debug=debug
+                debug=debug,
+                use_cache=use_cache
             )
             console.print()  # Blank line
         
@@ -165,12 +228,21 @@ def start_interactive_mode(
 
 def execute_command(
     prompt: str,
+    cli: Optional["TwoGiants"] = None,
     dry_run: bool = False,
     safe_mode: bool = True,
     session: Optional[str] = None,
-    debug: bool = False
-):
-    """Execute a single command (called by both modes)."""
+    debug: bool = False,
+    use_cache: bool = True
+) -> Optional[str]:
+    """Execute a single command (called by both modes).
+    
+    Args:
+        cli: TwoGiants instance to reuse (a new one is created if omitted)
+    
+    Returns:
+        The full response, or None if nothing was executed
+    """
     
     try:
         # Import here to avoid circular imports
@@ -184,15 +256,160 @@ def execute_command(
             console.print("[yellow]🔍 DRY RUN MODE - No execution[/yellow]")
             return
         
-        # Create TwoGiants instance
-        cli = TwoGiants(safe_mode=safe_mode, debug=debug)
+        if cli is None:
+            cli = TwoGiants(safe_mode=safe_mode, debug=debug, use_cache=use_cache)
         
-        # Execute
+        # Execute, displaying the response as it streams in
         console.print("[dim]🤖 2Giants is thinking...[/dim]")
-        response = cli.execute(prompt, session=session)
+        return _run(_stream_response(cli, prompt, session))
+    
+    except Exception as e:
+        console.print(f"[red]❌ Error:[/red] {e}")
+        if debug:
+            import traceback
+            console.print(traceback.format_exc())
+
+
+def _submit(coro) -> concurrent.futures.Future:
+    """Schedule a coroutine on the session's event loop (started on first use)."""
+    global _loop
+    
+    if _loop is None:
+        _loop = asyncio.new_event_loop()
+        threading.Thread(target=_loop.run_forever, name="2giants-loop", daemon=True).start()
+    
+    return asyncio.run_coroutine_threadsafe(coro, _loop)
+
+
+def _run(coro):
+    """Run a coroutine on the session's event loop and wait for its result."""
+    future = _submit(coro)
+    
+    try:
+        return future.result()
+    except KeyboardInterrupt:
+        future.cancel()
+        raise
+
+
+async def _warmup(safe_mode: bool, debug: bool, use_cache: bool):
+    """Create the TwoGiants instance of interactive mode and open its connection."""
+    from twogiants.main import TwoGiants
+    
+    cli = TwoGiants(safe_mode=safe_mode, debug=debug, use_cache=use_cache)
+    await cli.warmup()
+    return cli
+
+
+def _load_history(history_file: Path):
+    """Build the prompt history, loaded and appended in background threads.
+    
+    Args:
+        history_file: Path to the history file
+    
+    Returns:
+        prompt_toolkit history for the PromptSession
+    """
+    from prompt_toolkit.history import FileHistory, ThreadedHistory
+    
+    class BackgroundFileHistory(FileHistory):
+        """FileHistory whose appends never block the prompt."""
+        
+        def store_string(self, string: str) -> None:
+            # Single worker: entries are written in order, and pending ones are flushed at exit
+            _history_writer.submit(super().store_string, string)
+    
+    return ThreadedHistory(BackgroundFileHistory(str(history_file)))
+
+
+def _trim_history(history_file: Path, max_lines: int = HISTORY_MAX_LINES) -> None:
+    """Keep only the last max_lines lines of the history file (whole entries).
+    
+    Args:
+        history_file: Path to the history file
+        max_lines: Maximum number of lines to keep
+    """
+    try:
+        with open(history_file, "rb") as f:
+            tail = deque(f, maxlen=max_lines + 1)
+    except FileNotFoundError:
+        return
+    
+    if len(tail) <= max_lines:
+        return
+    
+    # Drop the cut entry: entries start with a "# <timestamp>" line
+    tail.popleft()
+    while tail and not tail[0].startswith(b"#"):
+        tail.popleft()
+    
+    tmp_file = history_file.with_name(history_file.name + ".tmp")
+    try:
+        tmp_file.write_bytes(b"".join(tail))
+        os.replace(tmp_file, history_file)
+    except OSError:
+        pass  # Keep the full history rather than fail startup
+
+
+async def _stream_response(cli, prompt: str, session: Optional[str]) -> str:
+    """Display a streamed response live and return the accumulated text."""
+    from rich.live import Live
+    from rich.text import Text
+    
+    chunks = []
+    live = None
+    
+    try:
+        async for chunk in cli.stream(prompt, session=session):
+            chunks.append(chunk)
+            
+            # Started on the first chunk so routing messages print above it
+            if live is None:
+                live = Live(console=console, refresh_per_second=12, vertical_overflow="visible")
+                live.start()
+            
+            live.update(Text.assemble(("🤖 2Giants: ", "green"), "".join(chunks)))
+    
+    finally:
+        if live is not None:
+            live.stop()
+    
+    return "".join(chunks)
+
+
+def execute_batch(
+    prompts: List[str],
+    cli: Optional["TwoGiants"] = None,
+    safe_mode: bool = True,
+    session: Optional[str] = None,
+    debug: bool = False,
+    use_cache: bool = True
+) -> None:
+    """Execute several commands with batched calls (batch command).
+    
+    Args:
+        cli: TwoGiants instance to reuse (a new one is created if omitted)
+    """
+    
+    try:
+        from rich.text import Text
+        from twogiants.main import TwoGiants
         
-        # Display response
-        console.print(f"[green]🤖 2Giants:[/green] {response}")
+        if cli is None:
+            cli = TwoGiants(safe_mode=safe_mode, debug=debug, use_cache=use_cache)
+        
+        for start in range(0, len(prompts), MAX_BATCH):
+            batch = prompts[start:start + MAX_BATCH]
+            
+            console.print(f"[dim]🤖 2Giants is thinking ({len(batch)} commands)...[/dim]")
+            responses = _run(cli.execute_batch(batch, session=session))
+            
+            for prompt, response in zip(batch, responses):
+                # Printed as Text: prompts and replies may contain [brackets]
+                console.print(Text.assemble(("💬 You: ", "cyan"), prompt))
+                console.print()
+                console.print(Text.assemble(("🤖 2Giants: ", "green"), response))
+                console.print()
     
     except Exception as e:
         console.print(f"[red]❌ Error:[/red] {e}")
@@ -200,9 +417,12 @@ def execute_command(
             import traceback
             console.print(traceback.format_exc())
 
-def show_help():
+
+def show_help() -> None:
     """Show help message in interactive mode."""
     
+    from rich.panel import Panel
+    
     help_text = """
 [cyan bold]Available Commands:[/cyan bold]
 
@@ -217,6 +437,8 @@ def show_help():
 [yellow]Special Commands:[/yellow]
   [cyan]help, ?[/cyan]      Show this help message
   [cyan]clear, cls[/cyan]   Clear the screen
+  [cyan]batch[/cyan]        Run the following lines as separate commands
+                 (paste "batch" then one command per line)
   [cyan]exit, quit[/cyan]   Exit interactive mode
   
 [yellow]Tips:[/yellow]
@@ -251,10 +473,13 @@ def history(
 def chat(
     safe_mode: bool = typer.Option(True, "--safe/--unsafe"),
     session: Optional[str] = typer.Option(None, "--session", "-s"),
-    debug: bool = typer.Option(False, "--debug")
+    debug: bool = typer.Option(False, "--debug"),
+    no_cache: bool = typer.Option(False, "--no-cache")
 ):
     """Start interactive chat mode (same as running '2g' with no args)."""
-    start_interactive_mode(safe_mode=safe_mode, session=session, debug=debug)
+    start_interactive_mode(
+        safe_mode=safe_mode, session=session, debug=debug, use_cache=not no_cache
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,344 @@
+"""Gemini LLM - Thin wrapper around the native google-genai SDK."""
+
+import asyncio
+import contextlib
+import os
+import time
+from collections import OrderedDict, deque
+from typing import AsyncIterator, Deque, List, Optional, Sequence, Tuple, Union
+
+import httpx
+from google import genai
+from google.genai import types
+
+# A plain prompt, or chat messages as (role, text) tuples
+Messages = Union[str, Sequence[Tuple[str, str]]]
+
+# Shared HTTP/2 keep-alive pools, reused by every Gemini client of the process
+_LIMITS = httpx.Limits(max_keepalive_connections=32)
+_http_client = httpx.Client(http2=True, limits=_LIMITS)
+_async_http_client = httpx.AsyncClient(http2=True, limits=_LIMITS)
+
+# Explicit caches need at least this many tokens (Gemini 2.5 Flash minimum),
+# estimated at ~4 characters per token so undersized creates aren't even attempted
+CACHE_MIN_TOKENS = 1024
+CACHE_MIN_CHARS = CACHE_MIN_TOKENS * 4
+
+# Prompt prefix caching (see PromptPrefixCache)
+PREFIX_MIN_CHARS = 256
+PREFIX_MIN_HITS = 3
+PREFIX_HISTORY = 64
+PREFIX_CACHE_SIZE = 16
+PREFIX_CACHE_TTL = 3600
+PREFIX_FAILED_SIZE = 256
+
+_ROLES = {"user": "user", "human": "user", "assistant": "model", "ai": "model", "model": "model"}
+
+
+def create_client(api_key: str) -> genai.Client:
+    """Create a Gemini client using the shared HTTP/2 connection pools.
+
+    Args:
+        api_key: Google API key for Gemini
+
+    Returns:
+        Native google-genai client
+    """
+    return genai.Client(
+        api_key=api_key,
+        http_options=types.HttpOptions(
+            httpx_client=_http_client,
+            httpx_async_client=_async_http_client
+        )
+    )
+
+
+class GeminiLLM:
+    """A Gemini model with fixed generation settings."""
+
+    def __init__(self, client: genai.Client, model: str, temperature: float):
+        """Initialize the model wrapper.
+
+        Args:
+            client: Native google-genai client
+            model: Gemini model name
+            temperature: Sampling temperature
+        """
+        self.client = client
+        self.model = model
+        self.temperature = temperature
+
+    def invoke(self, messages: Messages, cached_content: Optional[str] = None) -> str:
+        """Generate a completion.
+
+        Args:
+            messages: Prompt string or list of (role, text) messages
+            cached_content: Name of a cached content to use as prompt prefix
+
+        Returns:
+            Generated text
+        """
+        response = self.client.models.generate_content(
+            **self._request(messages, cached_content)
+        )
+        return response.text or ""
+
+    async def ainvoke(self, messages: Messages, cached_content: Optional[str] = None) -> str:
+        """Async version of invoke()."""
+        response = await self.client.aio.models.generate_content(
+            **self._request(messages, cached_content)
+        )
+        return response.text or ""
+
+    async def astream(
+        self,
+        messages: Messages,
+        cached_content: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """Generate a completion, yielding text chunks as they arrive.
+
+        Args:
+            messages: Prompt string or list of (role, text) messages
+            cached_content: Name of a cached content to use as prompt prefix
+
+        Yields:
+            Chunks of generated text
+        """
+        stream = await self.client.aio.models.generate_content_stream(
+            **self._request(messages, cached_content)
+        )
+        # Releases the HTTP response as soon as the caller stops reading
+        async with contextlib.aclosing(stream):
+            async for response in stream:
+                if response.text:
+                    yield response.text
+
+    async def abatch(
+        self,
+        inputs: List[Messages],
+        return_exceptions: bool = False,
+        cached_content: Optional[str] = None
+    ) -> list:
+        """Generate completions for several inputs concurrently (multiplexed over HTTP/2).
+
+        Args:
+            inputs: One prompt or message list per completion
+            return_exceptions: Return errors in place of results instead of raising
+            cached_content: Name of a cached content to use as prompt prefix
+
+        Returns:
+            Generated texts (or exceptions), in the same order as inputs
+        """
+        return await asyncio.gather(
+            *(self.ainvoke(messages, cached_content) for messages in inputs),
+            return_exceptions=return_exceptions
+        )
+
+    async def awarmup(self) -> None:
+        """Establish a pooled connection with a cheap request (model metadata)."""
+        await self.client.aio.models.get(model=self.model)
+
+    def create_cache(
+        self,
+        system_instruction: str,
+        ttl_seconds: int,
+        prefix: Optional[str] = None
+    ) -> str:
+        """Cache a system instruction server-side so requests don't resend it.
+
+        Args:
+            system_instruction: Static instruction to cache
+            ttl_seconds: Lifetime of the cache
+            prefix: Optional start of the user prompt to cache with it
+
+        Returns:
+            Name of the cached content, to pass as cached_content
+        """
+        cache = self.client.caches.create(
+            model=self.model,
+            config=self._cache_config(system_instruction, ttl_seconds, prefix)
+        )
+        return cache.name
+
+    async def acreate_cache(
+        self,
+        system_instruction: str,
+        ttl_seconds: int,
+        prefix: Optional[str] = None
+    ) -> str:
+        """Async version of create_cache()."""
+        cache = await self.client.aio.caches.create(
+            model=self.model,
+            config=self._cache_config(system_instruction, ttl_seconds, prefix)
+        )
+        return cache.name
+
+    async def adelete_cache(self, name: str) -> None:
+        """Delete a cached content before its TTL expires."""
+        await self.client.aio.caches.delete(name=name)
+
+    @staticmethod
+    def _cache_config(
+        system_instruction: str,
+        ttl_seconds: int,
+        prefix: Optional[str] = None
+    ) -> types.CreateCachedContentConfig:
+        """Build the configuration of a cached system instruction (and prompt prefix)."""
+        contents = None
+        if prefix is not None:
+            contents = [types.Content(role="user", parts=[types.Part(text=prefix)])]
+
+        return types.CreateCachedContentConfig(
+            system_instruction=system_instruction,
+            contents=contents,
+            ttl=f"{ttl_seconds}s"
+        )
+
+    def _request(self, messages: Messages, cached_content: Optional[str] = None) -> dict:
+        """Build generate_content() arguments from a prompt or messages."""
+        system_parts = []
+        contents = []
+
+        if isinstance(messages, str):
+            contents.append(types.Content(role="user", parts=[types.Part(text=messages)]))
+        else:
+            for role, text in messages:
+                if role == "system":
+                    system_parts.append(text)
+                else:
+                    contents.append(
+                        types.Content(role=_ROLES.get(role, "user"), parts=[types.Part(text=text)])
+                    )
+
+        # With cached_content, callers pass no system message (it lives in the cache)
+        config = types.GenerateContentConfig(
+            temperature=self.temperature,
+            system_instruction="\n\n".join(system_parts) if system_parts else None,
+            cached_content=cached_content
+        )
+
+        return {"model": self.model, "contents": contents, "config": config}
+
+
+class PromptPrefixCache:
+    """Server-side caches for prompt prefixes that keep coming back.
+
+    Once PREFIX_MIN_HITS recent prompts (with the same system instruction)
+    start with the same text of at least PREFIX_MIN_CHARS, that prefix is
+    cached together with the system instruction, provided both reach the
+    model's minimum cacheable size (CACHE_MIN_CHARS). Later prompts starting
+    with it only send the rest, and Gemini skips the cached prefill.
+    """
+
+    def __init__(self, llm: GeminiLLM):
+        """Initialize the prefix cache.
+
+        Args:
+            llm: Model the cached contents are created for
+        """
+        self.llm = llm
+        self._recent: Deque[Tuple[str, str]] = deque(maxlen=PREFIX_HISTORY)
+        # (system instruction, prefix) → (cached content name, expiry), oldest first
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[str, float]]" = OrderedDict()
+        # Prefixes the server refused, oldest first (values unused)
+        self._failed: "OrderedDict[Tuple[str, str], None]" = OrderedDict()
+
+    async def prepare(self, system_instruction: str, prompt: str) -> Tuple[Messages, Optional[str]]:
+        """Build the request for a prompt, reusing or creating a prefix cache.
+
+        Args:
+            system_instruction: System instruction of the request
+            prompt: User prompt
+
+        Returns:
+            Tuple of (messages, cached_content name or None) for invoke()/astream()
+        """
+        key = self._lookup(system_instruction, prompt)
+
+        if key is None:
+            prefix = self._repeated_prefix(system_instruction, prompt)
+            if prefix is not None:
+                key = await self._create(system_instruction, prefix)
+
+        self._recent.append((system_instruction, prompt))
+
+        if key is None:
+            return [("system", system_instruction), ("user", prompt)], None
+
+        self._entries.move_to_end(key)
+        name, _ = self._entries[key]
+        return [("user", prompt[len(key[1]):])], name
+
+    def _lookup(self, system_instruction: str, prompt: str) -> Optional[Tuple[str, str]]:
+        """Find the longest live cached prefix of a prompt (a handful of entries, no index needed)."""
+        now = time.monotonic()
+        best = None
+
+        for key, (_, expiry) in self._entries.items():
+            cached_system, prefix = key
+            if (
+                cached_system == system_instruction
+                and expiry > now
+                and len(prompt) > len(prefix)
+                and prompt.startswith(prefix)
+                and (best is None or len(prefix) > len(best[1]))
+            ):
+                best = key
+
+        return best
+
+    def _repeated_prefix(self, system_instruction: str, prompt: str) -> Optional[str]:
+        """Longest prefix shared by the prompt and enough recent prompts, if long enough."""
+        shared = sorted(
+            (
+                len(os.path.commonprefix([prompt, previous]))
+                for system, previous in self._recent
+                if system == system_instruction
+            ),
+            reverse=True
+        )
+
+        # The prompt itself counts as one hit
+        if len(shared) < PREFIX_MIN_HITS - 1:
+            return None
+
+        prefix = prompt[:shared[PREFIX_MIN_HITS - 2]]
+
+        # The cached content (system instruction + prefix) must reach the model's minimum
+        min_chars = max(PREFIX_MIN_CHARS, CACHE_MIN_CHARS - len(system_instruction))
+
+        # Cut at a word boundary, and keep something to send after the prefix
+        boundary = max(prefix.rfind(" "), prefix.rfind("\n"))
+        if boundary >= min_chars:
+            prefix = prefix[:boundary + 1]
+
+        if len(prefix) < min_chars or len(prefix) >= len(prompt):
+            return None
+        if (system_instruction, prefix) in self._failed:
+            return None
+        return prefix
+
+    async def _create(self, system_instruction: str, prefix: str) -> Optional[Tuple[str, str]]:
+        """Create the cached content of a prefix, evicting the oldest entry if full."""
+        key = (system_instruction, prefix)
+
+        try:
+            name = await self.llm.acreate_cache(system_instruction, PREFIX_CACHE_TTL, prefix)
+        except Exception:
+            # e.g. refused by the server: don't retry this prefix
+            self._failed[key] = None
+            if len(self._failed) > PREFIX_FAILED_SIZE:
+                self._failed.popitem(last=False)
+            return None
+
+        # Refreshed a minute before the server drops it
+        self._entries[key] = (name, time.monotonic() + PREFIX_CACHE_TTL - 60)
+
+        while len(self._entries) > PREFIX_CACHE_SIZE:
+            _, (old_name, _) = self._entries.popitem(last=False)
+            try:
+                await self.llm.adelete_cache(old_name)
+            except Exception:
+                pass  # Expires with its TTL anyway
+
+        return key
@@ -1,31 +1,51 @@
 """2Giants Main Class - Core orchestration."""
 
-from dotenv import load_dotenv
+import asyncio
+import contextlib
 import os
-from typing import Optional
-from langchain_google_genai import ChatGoogleGenerativeAI
+from typing import AsyncGenerator, AsyncIterator, List, Optional
 from rich.console import Console
 
-# Load environment variables
-load_dotenv()
-
 console = Console()
 
+CONVERSATION_SYSTEM_PROMPT = """You are 2Giants, a friendly and helpful AI assistant.
+You answer questions, explain concepts, and have casual conversations.
+Be concise but thorough. Be friendly but professional.
+If the user wants to execute something, suggest they rephrase as a command."""
+
+RESEARCH_SYSTEM_PROMPT = """You are 2Giants Research Agent.
+Answer the query using your knowledge. Be factual and cite when possible.
+Note: Web search and documentation indexing will be added soon for current information."""
+
+RESEARCH_HEADER = "🔍 Research Mode (Basic - Web search coming soon)\n\n"
+RESEARCH_FOOTER = (
+    "\n\n💡 Note: Full research capabilities with web search and documentation "
+    "indexing are being implemented."
+)
+
+
+def _load_env() -> None:
+    """Load environment variables from .env (only needed when TwoGiants is created)."""
+    from dotenv import load_dotenv
+    load_dotenv()
+
 
 class TwoGiants:
     """Main class for 2Giants CLI - orchestrates all agents and workflows."""
     
-    def __init__(self, safe_mode: bool = True, debug: bool = False):
+    def __init__(self, safe_mode: bool = True, debug: bool = False, use_cache: bool = True):
         """Initialize 2Giants.
         
         Args:
             safe_mode: Enable safety checks and human approval
             debug: Enable debug logging
+            use_cache: Reuse cached routing decisions
         """
         self.safe_mode = safe_mode
         self.debug = debug
         
         # Load API key
+        _load_env()
         self.api_key = os.getenv("GOOGLE_API_KEY")
         if not self.api_key:
             raise ValueError(
@@ -33,23 +53,41 @@ class TwoGiants:
                 "Please create a .env file with your API key."
             )
         
-        # Initialize Router Agent
         from twogiants.agents.router import RouterAgent
-        self.router = RouterAgent(api_key=self.api_key, debug=debug)
+        from twogiants.llm import GeminiLLM, PromptPrefixCache, create_client
+        
+        # One Gemini client (and connection pool) shared by every agent
+        self._client = create_client(self.api_key)
+        
+        # Initialize Router Agent
+        self.router = RouterAgent(
+            api_key=self.api_key, debug=debug, use_cache=use_cache, client=self._client
+        )
         
         # Initialize base LLM (for simple responses)
-        self.llm = ChatGoogleGenerativeAI(
+        self.llm = GeminiLLM(
+            self._client,
             model="gemini-3-flash-preview",
-            temperature=0.7,
-            api_key=self.api_key
+            temperature=0.7
         )
         
+        # Server-side caching of prompt prefixes the user keeps repeating
+        self._prefixes = PromptPrefixCache(self.llm)
+        
         if self.debug:
             console.print("[dim]🔧 Debug mode enabled[/dim]")
             console.print(f"[dim]🔑 API Key: {self.api_key[:10]}...[/dim]")
             console.print("[dim]🧭 Router Agent initialized[/dim]")
     
-    def execute(self, prompt: str, session: Optional[str] = None) -> str:
+    async def warmup(self) -> None:
+        """Open the connection to Gemini ahead of the first command."""
+        try:
+            await self.llm.awarmup()
+        except Exception as e:
+            if self.debug:
+                console.print(f"[dim]🔌 Warm-up failed: {e}[/dim]")
+    
+    async def execute(self, prompt: str, session: Optional[str] = None) -> str:
         """Execute a user command.
         
         Args:
@@ -57,15 +95,40 @@ class TwoGiants:
             session: Optional session ID for context
         
         Returns:
-            Response string to display to user
+            Response string to display to user (use stream() to display it progressively)
+        """
+        
+        return "".join([chunk async for chunk in self.stream(prompt, session=session)])
+    
+    async def stream(self, prompt: str, session: Optional[str] = None) -> AsyncIterator[str]:
+        """Execute a user command, yielding the response as it is generated.
+        
+        When Gemini has to be asked for the route, the conversation answer
+        (the most common route) is requested at the same time and discarded
+        if the route turns out to be something else.
+        
+        Args:
+            prompt: User's natural language command
+            session: Optional session ID for context
+        
+        Yields:
+            Chunks of the response string
         """
         
         if self.debug:
             console.print(f"[dim]📥 Received: {prompt}[/dim]")
         
+        conversation = None
+        first_chunk = None
+        
         try:
-            # Route the command
-            route = self.router.route(prompt)
+            # Route the command (keywords / cache / local classifier first)
+            route = self.router.quick_route(prompt)
+            
+            if route is None:
+                conversation = self._handle_conversation(prompt)
+                first_chunk = asyncio.create_task(self._next_chunk(conversation))
+                route = await self.router.aclassify(prompt)
             
             # Show routing info
             route_desc = self.router.get_route_description(route)
@@ -73,18 +136,100 @@ class TwoGiants:
             console.print()
             
             # Handle based on route
-            if route == "conversation":
-                return self._handle_conversation(prompt)
-            
-            elif route == "executor":
-                return self._handle_executor(prompt)
+            if route == "executor":
+                await self._discard(first_chunk, conversation)
+                yield self._handle_executor(prompt)
             
             elif route == "research":
-                return self._handle_research(prompt)
+                await self._discard(first_chunk, conversation)
+                async with contextlib.aclosing(self._handle_research(prompt)) as research:
+                    async for chunk in research:
+                        yield chunk
             
             else:
-                # Fallback (should not happen)
-                return self._handle_conversation(prompt)
+                # Conversation (also the fallback, should not happen otherwise)
+                if conversation is None:
+                    conversation = self._handle_conversation(prompt)
+                else:
+                    chunk = await first_chunk
+                    if chunk is not None:
+                        yield chunk
+                
+                async for chunk in conversation:
+                    yield chunk
+        
+        except Exception as e:
+            console.print(f"[red]❌ Error:[/red] {e}")
+            
+            if self.debug:
+                import traceback
+                console.print(traceback.format_exc())
+            
+            yield f"Sorry, I encountered an error: {e}"
+        
+        finally:
+            await self._discard(first_chunk, conversation)
+    
+    async def execute_batch(self, prompts: List[str], session: Optional[str] = None) -> List[str]:
+        """Execute several commands at once (e.g. a pasted block of commands).
+        
+        Routing and answers are each requested with one batched call instead
+        of one round-trip per command.
+        
+        Args:
+            prompts: User's natural language commands
+            session: Optional session ID for context
+        
+        Returns:
+            One response string per prompt, in the same order
+        """
+        
+        if self.debug:
+            console.print(f"[dim]📥 Received batch of {len(prompts)} commands[/dim]")
+        
+        try:
+            # Route: cache / local classifier first, one batched Gemini call for the rest
+            routes = [self.router.quick_route(prompt) for prompt in prompts]
+            pending = [i for i, route in enumerate(routes) if route is None]
+            if pending:
+                classified = await self.router.aclassify_batch([prompts[i] for i in pending])
+                for i, route in zip(pending, classified):
+                    routes[i] = route
+            
+            responses: List[str] = [""] * len(prompts)
+            
+            batches = {"conversation": [], "research": []}
+            for i, (prompt, route) in enumerate(zip(prompts, routes)):
+                if route == "executor":
+                    responses[i] = self._handle_executor(prompt)
+                elif route == "research":
+                    batches["research"].append(i)
+                else:
+                    batches["conversation"].append(i)
+            
+            system_prompts = {
+                "conversation": CONVERSATION_SYSTEM_PROMPT,
+                "research": RESEARCH_SYSTEM_PROMPT,
+            }
+            
+            for route, indexes in batches.items():
+                if not indexes:
+                    continue
+                
+                results = await self.llm.abatch(
+                    [[("system", system_prompts[route]), ("user", prompts[i])] for i in indexes],
+                    return_exceptions=True
+                )
+                
+                for i, result in zip(indexes, results):
+                    if isinstance(result, Exception):
+                        responses[i] = f"Sorry, I encountered an error: {result}"
+                    elif route == "research":
+                        responses[i] = self._format_research(result)
+                    else:
+                        responses[i] = result
+            
+            return responses
         
         except Exception as e:
             console.print(f"[red]❌ Error:[/red] {e}")
@@ -93,27 +238,43 @@ class TwoGiants:
                 import traceback
                 console.print(traceback.format_exc())
             
-            return f"Sorry, I encountered an error: {e}"
+            return [f"Sorry, I encountered an error: {e}"] * len(prompts)
     
-    def _handle_conversation(self, prompt: str) -> str:
+    @staticmethod
+    async def _next_chunk(stream: AsyncIterator[str]) -> Optional[str]:
+        """Get the next chunk of a response stream (None when it is over)."""
+        return await anext(stream, None)
+    
+    @staticmethod
+    async def _discard(task: Optional[asyncio.Task], stream: Optional[AsyncGenerator]) -> None:
+        """Cancel a speculative answer's pending first chunk, then close its stream.
+        
+        Also closes answers the caller stopped reading, so their HTTP response is
+        released now instead of when the generator is garbage collected.
+        """
+        if task is not None:
+            task.cancel()
+            await asyncio.wait([task])
+            if not task.cancelled():
+                # Mark the exception (if any) as retrieved
+                task.exception()
+        
+        if stream is not None:
+            await stream.aclose()
+    
+    async def _handle_conversation(self, prompt: str) -> AsyncIterator[str]:
         """Handle conversation requests.
         
         TODO: Implement dedicated Conversation Agent
         For now, uses basic Gemini.
         """
         
-        system_prompt = """You are 2Giants, a friendly and helpful AI assistant.
-You answer questions, explain concepts, and have casual conversations.
-Be concise but thorough. Be friendly but professional.
-If the user wants to execute something, suggest they rephrase as a command."""
-        
-        messages = [
-            ("system", system_prompt),
-            ("user", prompt)
-        ]
+        messages, cached_content = await self._prefixes.prepare(CONVERSATION_SYSTEM_PROMPT, prompt)
         
-        response = self.llm.invoke(messages)
-        return response.text
+        # Closing this generator closes the Gemini stream too
+        async with contextlib.aclosing(self.llm.astream(messages, cached_content=cached_content)) as chunks:
+            async for chunk in chunks:
+                yield chunk
     
     def _handle_executor(self, prompt: str) -> str:
         """Handle execution requests.
@@ -135,26 +296,23 @@ The Executor Agent will:
 
 This feature is being implemented. For now, you can ask me questions about what this command would do!"""
     
-    def _handle_research(self, prompt: str) -> str:
+    async def _handle_research(self, prompt: str) -> AsyncIterator[str]:
         """Handle research requests.
         
         TODO: Implement Research Agent with RAG + web search
         For now, uses Gemini knowledge.
         """
         
-        system_prompt = """You are 2Giants Research Agent.
-Answer the query using your knowledge. Be factual and cite when possible.
-Note: Web search and documentation indexing will be added soon for current information."""
+        messages, cached_content = await self._prefixes.prepare(RESEARCH_SYSTEM_PROMPT, prompt)
         
-        messages = [
-            ("system", system_prompt),
-            ("user", prompt)
-        ]
-        
-        response = self.llm.invoke(messages)
+        yield RESEARCH_HEADER
+        async with contextlib.aclosing(self.llm.astream(messages, cached_content=cached_content)) as chunks:
+            async for chunk in chunks:
+                yield chunk
+        yield RESEARCH_FOOTER
+    
+    @staticmethod
+    def _format_research(answer: str) -> str:
+        """Wrap a research answer with the research mode notice."""
         
-        return f"""🔍 Research Mode (Basic - Web search coming soon)
-
-{response.text}
-
-💡 Note: Full research capabilities with web search and documentation indexing are being implemented."""
\ No newline at end of file
+        return RESEARCH_HEADER + answer + RESEARCH_FOOTER
\ No newline at end of file
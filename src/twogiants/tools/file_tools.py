@@ -1,9 +1,276 @@
 """File operation tools - Read, write, edit, list, delete files and directories."""
 
-from langchain.tools import tool
+from langchain_core.tools import tool
+import concurrent.futures
 import os
+import shutil
+import stat
+import tempfile
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Raw file descriptors: no stdio buffering, no newline translation on Windows.
+# O_NONBLOCK keeps opening a FIFO from blocking until a writer shows up (the S_ISREG
+# check then rejects it), and has no effect on regular files.
+_READ_FLAGS = (
+    os.O_RDONLY | getattr(os, "O_NONBLOCK", 0) | getattr(os, "O_CLOEXEC", 0) | getattr(os, "O_BINARY", 0)
+)
+_WRITE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_CLOEXEC", 0) | getattr(os, "O_BINARY", 0)
+
+# Read size when fstat() reports no size (e.g. /proc files)
+_READ_CHUNK = 64 * 1024
+
+# Same-length edits are patched in place when matches are at most this dense
+# (each costs a Python-level loop step, the rebuild path costs per byte)
+_PATCH_BYTES_PER_MATCH = 1024
+
+# Directory reads run in parallel in recursive listings (I/O bound, GIL released)
+_SCAN_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# One scanned directory: ([(file name, size)], [(subdirectory path, name)])
+DirScan = Tuple[List[Tuple[str, int]], List[Tuple[str, str]]]
+
+
+def _classify(path: str) -> Tuple[Optional[os.stat_result], Optional[int]]:
+    """Stat a path once, for both the "exists?" and the "what is it?" checks.
+    
+    Args:
+        path: Path to check
+    
+    Returns:
+        Tuple of (stat result, file type as stat.S_IFMT()), or (None, None) if it doesn't exist
+    """
+    try:
+        st = os.stat(path)
+    except (FileNotFoundError, NotADirectoryError):
+        return None, None
+    return st, stat.S_IFMT(st.st_mode)
+
+
+def _read_fd(fd: int, size: int) -> bytes:
+    """Read an open file until EOF, sized from fstat() so one read() gets it all."""
+    chunks = []
+    bufsize = size + 1 if size else _READ_CHUNK
+    
+    while True:
+        chunk = os.read(fd, bufsize)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    
+    return b"".join(chunks)
+
+
+def _write_fd(fd: int, data: bytes) -> None:
+    """Write bytes to a file descriptor with unbuffered write() calls (usually a single one)."""
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+
+def _write_file(filepath: str, data: bytes, flags: int = _WRITE_FLAGS) -> None:
+    """Write bytes to a file, creating it with default permissions."""
+    fd = os.open(filepath, flags, 0o666)
+    try:
+        _write_fd(fd, data)
+    finally:
+        os.close(fd)
+
+
+def _patch_in_place(data: bytes, old: bytes, new: bytes) -> bytearray:
+    """Replace every old with new (same length) in a copy of data, overwriting the bytes where they are."""
+    buf = bytearray(data)
+    size = len(old)
+    
+    i = buf.find(old)
+    while i >= 0:
+        buf[i:i + size] = new
+        i = buf.find(old, i + size)
+    
+    return buf
+
+
+def _make_backup(filepath: str, backup_path: str, link: bool) -> None:
+    """Keep the current file as backup_path.
+    
+    Args:
+        filepath: File about to be edited
+        backup_path: Backup to (re)create
+        link: If True, hard link (no copy) when the filesystem allows it, for files about
+            to be replaced by a new inode. Files rewritten in place need a copy.
+    """
+    # Also unlinks a stale backup still linked to filepath itself
+    try:
+        os.unlink(backup_path)
+    except FileNotFoundError:
+        pass
+    
+    if link:
+        try:
+            # Link the file itself, not a symlink pointing to it
+            os.link(os.path.realpath(filepath), backup_path)
+            return
+        except OSError:
+            pass
+    
+    shutil.copyfile(filepath, backup_path)
+
+
+def _check_writable(filepath: str) -> None:
+    """Raise PermissionError unless filepath can be opened for writing (without truncating it).
+    
+    Replacing a file only needs a writable directory, so its own permissions are checked first.
+    """
+    os.close(os.open(filepath, os.O_WRONLY | getattr(os, "O_CLOEXEC", 0)))
+
+
+def _can_replace(st: os.stat_result) -> bool:
+    """Whether a new inode can take a file's place without losing its other links or its owner."""
+    if st.st_nlink > 1:
+        return False
+    if not hasattr(os, "geteuid"):
+        return True
+    
+    euid = os.geteuid()
+    # Unprivileged processes can only give away files to themselves and their own groups
+    return euid == 0 or (st.st_uid == euid and (st.st_gid == os.getegid() or st.st_gid in os.getgroups()))
+
+
+def _replace_file(filepath: str, data: bytes, st: os.stat_result) -> None:
+    """Atomically replace a file's content (new inode, same owner, permissions and xattrs).
+    
+    Args:
+        filepath: File to replace (symlinks are followed)
+        data: New content
+        st: stat() result of the file (owner to keep)
+    """
+    # Write through symlinks instead of replacing them
+    target = os.path.realpath(filepath)
+    # Unique name created with O_EXCL: never clobbers or follows an existing file
+    fd, tmp_path = tempfile.mkstemp(
+        prefix=os.path.basename(target) + '.',
+        suffix='.tmp',
+        dir=os.path.dirname(target)
+    )
+    
+    try:
+        try:
+            _write_fd(fd, data)
+            tmp_st = os.fstat(fd)
+        finally:
+            os.close(fd)
+        
+        if hasattr(os, "chown") and (tmp_st.st_uid, tmp_st.st_gid) != (st.st_uid, st.st_gid):
+            os.chown(tmp_path, st.st_uid, st.st_gid)
+        # Mode, flags, xattrs (ACLs included), then a fresh modification time
+        shutil.copystat(target, tmp_path)
+        os.utime(tmp_path)
+        os.replace(tmp_path, target)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _scan_dir(root: str, show_hidden: bool, sort: bool) -> Optional[DirScan]:
+    """Read one directory for the recursive listing.
+    
+    Args:
+        root: Directory path
+        show_hidden: If True, include entries starting with .
+        sort: If True, sort files by name
+    
+    Returns:
+        Tuple of ([(file name, size)], [(subdirectory path, name)]), or None if unreadable
+    """
+    # Unreadable directories are skipped, like os.walk() does
+    try:
+        with os.scandir(root) as it:
+            entries = list(it)
+    except OSError:
+        return None
+    
+    files = []
+    subdirs = []
+    for entry in entries:
+        if not show_hidden and entry.name.startswith('.'):
+            continue
+        if entry.is_dir():
+            # Symlinked directories aren't followed
+            if not entry.is_symlink():
+                subdirs.append((entry.path, entry.name))
+        else:
+            files.append((entry.name, entry.stat().st_size))
+    
+    if sort:
+        files.sort()
+    return files, subdirs
+
+
+def _scan_tree(path: str, show_hidden: bool, sort: bool) -> Dict[str, Optional[DirScan]]:
+    """Scan a directory tree, reading all directories of a level in parallel.
+    
+    Levels with a single directory (small or chain-like trees) are scanned inline;
+    the thread pool is only started once a level has several directories.
+    
+    Args:
+        path: Root directory
+        show_hidden: If True, include entries starting with .
+        sort: If True, sort files by name
+    
+    Returns:
+        Mapping of directory path to its _scan_dir() result
+    """
+    scans = {}
+    level = [path]
+    pool = None
+    
+    try:
+        while level:
+            if len(level) == 1:
+                results = [_scan_dir(level[0], show_hidden, sort)]
+            else:
+                if pool is None:
+                    pool = concurrent.futures.ThreadPoolExecutor(max_workers=_SCAN_WORKERS)
+                results = pool.map(lambda root: _scan_dir(root, show_hidden, sort), level)
+            scans.update(zip(level, results))
+            level = [sub_path for root in level if scans[root] for sub_path, _ in scans[root][1]]
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    
+    return scans
+
+
+def _render_tree(scans: Dict[str, Optional[DirScan]], root: str, name: str, depth: int) -> Iterator[str]:
+    """Yield the listing lines of a scanned directory: itself, its files, then its subdirectories."""
+    scan = scans[root]
+    if scan is None:
+        return
+    
+    files, subdirs = scan
+    indent = '  ' * depth
+    
+    yield f"{indent}📁 {name}/"
+    for file_name, size in files:
+        yield f"{indent}  📄 {file_name} ({size} bytes)"
+    
+    for sub_path, sub_name in subdirs:
+        yield from _render_tree(scans, sub_path, sub_name, depth + 1)
+
+
+def _count_lines(data: bytes) -> int:
+    """Count \\n-terminated lines, including a last line without newline."""
+    return data.count(b"\n") + (0 if not data or data.endswith(b"\n") else 1)
+
+
+def _universal_newlines(content: str) -> str:
+    """Translate \\r\\n and \\r to \\n, like text-mode reads do."""
+    if '\r' in content:
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+    return content
 
 
 @tool
@@ -25,21 +292,31 @@ def read_file(filepath: str) -> str:
         # Expand user home directory if present (~)
         filepath = os.path.expanduser(filepath)
         
-        # Check if file exists
-        if not os.path.exists(filepath):
+        # One open + fstat answers "exists?", "is a file?" and "how big?"
+        try:
+            fd = os.open(filepath, _READ_FLAGS)
+        except (FileNotFoundError, NotADirectoryError):
             return f"❌ Error: File not found: {filepath}"
-        
-        # Check if it's actually a file (not a directory)
-        if not os.path.isfile(filepath):
+        except IsADirectoryError:
             return f"❌ Error: {filepath} is not a file"
         
-        # Read file
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
+        try:
+            st = os.fstat(fd)
+            
+            # Check if it's actually a file (not a directory)
+            if not stat.S_ISREG(st.st_mode):
+                return f"❌ Error: {filepath} is not a file"
+            
+            # Not memory mapped: a file truncated while mapped (e.g. a rotated log) raises SIGBUS
+            data = _read_fd(fd, st.st_size)
+            size = len(data)
+            content = data.decode('utf-8')
+        finally:
+            os.close(fd)
         
-        # Get file size info
-        size = os.path.getsize(filepath)
-        lines = len(content.splitlines())
+        # Same newlines (and line count) as the text-mode read this replaces
+        content = _universal_newlines(content)
+        lines = content.count('\n') + (0 if not content or content.endswith('\n') else 1)
         
         return f"""✓ File: {filepath}
 Size: {size} bytes | Lines: {lines}
@@ -74,22 +351,25 @@ def write_file(filepath: str, content: str, overwrite: bool = False) -> str:
     """
     try:
         filepath = os.path.expanduser(filepath)
-        
-        # Check if file exists and overwrite is False
-        if os.path.exists(filepath) and not overwrite:
+        data = content.encode('utf-8')
+        flags = _WRITE_FLAGS if overwrite else _WRITE_FLAGS | os.O_EXCL
+        
+        # Write file (O_EXCL makes the open itself fail if the file exists and overwrite is False)
+        try:
+            try:
+                _write_file(filepath, data, flags)
+            except FileNotFoundError:
+                # Create parent directories only when they turn out to be missing
+                parent_dir = os.path.dirname(filepath)
+                if not parent_dir:
+                    raise
+                os.makedirs(parent_dir, exist_ok=True)
+                _write_file(filepath, data, flags)
+        except FileExistsError:
             return f"❌ Error: File already exists: {filepath}\nUse overwrite=True to replace it, or use edit_file to modify it."
         
-        # Create parent directories if they don't exist
-        parent_dir = os.path.dirname(filepath)
-        if parent_dir:
-            os.makedirs(parent_dir, exist_ok=True)
-        
-        # Write file
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(content)
-        
-        size = os.path.getsize(filepath)
-        lines = len(content.splitlines())
+        size = len(data)
+        lines = _count_lines(data)
         
         return f"✓ Created {filepath}\nSize: {size} bytes | Lines: {lines}"
     
@@ -124,33 +404,65 @@ def edit_file(filepath: str, old_text: str, new_text: str) -> str:
     try:
         filepath = os.path.expanduser(filepath)
         
-        # Check if file exists
-        if not os.path.exists(filepath):
-            return f"❌ Error: File not found: {filepath}"
+        # Every position "contains" the empty string: there is nothing meaningful to replace
+        if not old_text:
+            return "❌ Error: old_text must not be empty"
         
-        if not os.path.isfile(filepath):
+        # Open directly, the open and fstat are the existence and type checks (no race between them)
+        try:
+            fd = os.open(filepath, _READ_FLAGS)
+        except (FileNotFoundError, NotADirectoryError):
+            return f"❌ Error: File not found: {filepath}"
+        except IsADirectoryError:
             return f"❌ Error: {filepath} is not a file"
         
-        # Read current content
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
+        try:
+            st = os.fstat(fd)
+            if not stat.S_ISREG(st.st_mode):
+                return f"❌ Error: {filepath} is not a file"
+            
+            # Read current content
+            data = _read_fd(fd, st.st_size)
+        finally:
+            os.close(fd)
+        
+        content = data.decode('utf-8')
+        old_bytes = old_text.encode('utf-8')
+        new_bytes = new_text.encode('utf-8')
+        
+        # A few same-length matches are patched into a copy of the bytes, no rebuilt content
+        same_length = old_bytes and len(old_bytes) == len(new_bytes) and b'\r' not in data
+        occurrences = data.count(old_bytes) if same_length else 0
+        
+        if same_length and occurrences * _PATCH_BYTES_PER_MATCH <= len(data):
+            new_data = _patch_in_place(data, old_bytes, new_bytes)
+        else:
+            # Universal newlines, like the text-mode read this replaces
+            content = _universal_newlines(content)
+            
+            # Find, count and replace in a single scan of the content
+            parts = content.split(old_text)
+            occurrences = len(parts) - 1
+            new_data = new_text.join(parts).encode('utf-8')
         
         # Check if old_text exists
-        if old_text not in content:
+        if not occurrences:
             return f"❌ Error: Text not found in {filepath}\nSearched for: {old_text[:100]}..."
         
-        # Create backup
-        backup_path = filepath + '.bak'
-        with open(backup_path, 'w', encoding='utf-8') as f:
-            f.write(content)
+        # Refuse before the backup, like writing the file itself would
+        _check_writable(filepath)
         
-        # Replace text
-        new_content = content.replace(old_text, new_text)
-        occurrences = content.count(old_text)
+        # The replace gives filepath a new inode, so the backup can keep the old one. Files
+        # hard-linked elsewhere or owned by someone else are rewritten in place instead.
+        replace = _can_replace(st)
+        backup_path = filepath + '.bak'
+        _make_backup(filepath, backup_path, link=replace)
         
         # Write modified content
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(new_content)
+        if replace:
+            _replace_file(filepath, new_data, st)
+        else:
+            _write_file(filepath, new_data)
         
         return f"""✓ Edited {filepath}
 Replaced {occurrences} occurrence(s)
@@ -171,13 +483,19 @@ Changes:
 
 
 @tool
-def list_directory(path: str = ".", recursive: bool = False, show_hidden: bool = False) -> str:
+def list_directory(
+    path: str = ".",
+    recursive: bool = False,
+    show_hidden: bool = False,
+    sort: bool = True
+) -> str:
     """List contents of a directory.
     
     Args:
         path: Directory path (default: current directory)
         recursive: If True, list subdirectories recursively
         show_hidden: If True, show hidden files (starting with .)
+        sort: If True, sort entries by name (False is faster on huge directories)
     
     Returns:
         Formatted directory listing
@@ -186,61 +504,50 @@ def list_directory(path: str = ".", recursive: bool = False, show_hidden: bool =
         list_directory()
         list_directory("src")
         list_directory(".", recursive=True)
+        list_directory("node_modules", sort=False)
     """
     try:
         path = os.path.expanduser(path)
         
         # Check if directory exists
-        if not os.path.exists(path):
+        st, kind = _classify(path)
+        if st is None:
             return f"❌ Error: Directory not found: {path}"
         
-        if not os.path.isdir(path):
+        if kind != stat.S_IFDIR:
             return f"❌ Error: {path} is not a directory"
         
-        output = [f"📁 Contents of: {os.path.abspath(path)}\n"]
+        # Only relative paths need getcwd(), absolute ones are just normalized
+        header_path = os.path.normpath(path) if os.path.isabs(path) else os.path.abspath(path)
+        output = [f"📁 Contents of: {header_path}\n"]
         
         if recursive:
             # Recursive listing
-            items = []
-            for root, dirs, files in os.walk(path):
-                # Filter hidden if needed
-                if not show_hidden:
-                    dirs[:] = [d for d in dirs if not d.startswith('.')]
-                    files = [f for f in files if not f.startswith('.')]
-                
-                level = root.replace(path, '').count(os.sep)
-                indent = '  ' * level
-                
-                items.append(f"{indent}📁 {os.path.basename(root)}/")
-                
-                for file in sorted(files):
-                    file_path = os.path.join(root, file)
-                    size = os.path.getsize(file_path)
-                    items.append(f"{indent}  📄 {file} ({size} bytes)")
-            
-            output.extend(items)
+            scans = _scan_tree(path, show_hidden, sort)
+            output.extend(_render_tree(scans, path, os.path.basename(path), 0))
         
         else:
-            # Non-recursive listing
-            items = os.listdir(path)
+            # Non-recursive listing (scandir entries carry the file type, no stat per entry)
+            with os.scandir(path) as it:
+                entries = list(it)
             
             # Filter hidden if needed
             if not show_hidden:
-                items = [item for item in items if not item.startswith('.')]
+                entries = [entry for entry in entries if not entry.name.startswith('.')]
             
-            items.sort()
+            if sort:
+                entries.sort(key=lambda entry: entry.name)
             
             # Separate directories and files
             dirs = []
             files = []
             
-            for item in items:
-                full_path = os.path.join(path, item)
-                if os.path.isdir(full_path):
-                    dirs.append(f"📁 {item}/")
+            for entry in entries:
+                if entry.is_dir():
+                    dirs.append(f"📁 {entry.name}/")
                 else:
-                    size = os.path.getsize(full_path)
-                    files.append(f"📄 {item} ({size} bytes)")
+                    size = entry.stat().st_size
+                    files.append(f"📄 {entry.name} ({size} bytes)")
             
             # Display directories first, then files
             output.extend(dirs)
@@ -287,14 +594,15 @@ WARNING: This operation cannot be undone!"""
         filepath = os.path.expanduser(filepath)
         
         # Check if file exists
-        if not os.path.exists(filepath):
+        st, kind = _classify(filepath)
+        if st is None:
             return f"❌ Error: File not found: {filepath}"
         
-        if not os.path.isfile(filepath):
+        if kind != stat.S_IFREG:
             return f"❌ Error: {filepath} is not a file (use a different method for directories)"
         
-        # Get file info before deletion
-        size = os.path.getsize(filepath)
+        # Get file info before deletion (from the stat above)
+        size = st.st_size
         
         # Delete file
         os.remove(filepath)
@@ -327,8 +635,9 @@ def create_directory(path: str, parents: bool = True) -> str:
         path = os.path.expanduser(path)
         
         # Check if already exists
-        if os.path.exists(path):
-            if os.path.isdir(path):
+        st, kind = _classify(path)
+        if st is not None:
+            if kind == stat.S_IFDIR:
                 return f"ℹ️ Directory already exists: {path}"
             else:
                 return f"❌ Error: {path} exists but is not a directory"
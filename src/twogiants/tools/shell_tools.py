@@ -1,11 +1,140 @@
 """Shell and system operation tools - Execute commands, navigate directories, system info."""
 
-from langchain.tools import tool
+from langchain_core.tools import tool
+import functools
+import itertools
 import os
+import selectors
 import subprocess
 import platform
 import sys
-from typing import Optional
+import time
+from typing import Dict, Optional, Tuple
+
+try:
+    import psutil
+    
+    # The first non-blocking call only starts the measurement, later calls report usage since the previous one
+    psutil.cpu_percent(interval=None)
+except ImportError:
+    psutil = None
+
+# Command output kept per stream: the first and last bytes, the middle is dropped
+OUTPUT_HEAD_BYTES = 1 << 20
+OUTPUT_TAIL_BYTES = 1 << 20
+
+_PIPE_READ_SIZE = 64 * 1024
+
+
+class _CappedBuffer:
+    """Byte buffer keeping only the head and the tail of a stream."""
+    
+    def __init__(self, head_size: int = OUTPUT_HEAD_BYTES, tail_size: int = OUTPUT_TAIL_BYTES):
+        """Initialize an empty buffer.
+        
+        Args:
+            head_size: Number of leading bytes kept
+            tail_size: Number of trailing bytes kept
+        """
+        self.head_size = head_size
+        self.tail_size = tail_size
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.dropped = 0
+    
+    def write(self, data: bytes) -> None:
+        """Append data, dropping the oldest bytes after the head once the tail is full."""
+        room = self.head_size - len(self.head)
+        if room > 0:
+            self.head += data[:room]
+            data = data[room:]
+        
+        if data:
+            self.tail += data
+            excess = len(self.tail) - self.tail_size
+            if excess > 0:
+                # Deleting from the front of a bytearray doesn't move the rest
+                del self.tail[:excess]
+                self.dropped += excess
+    
+    def getvalue(self) -> str:
+        """Decode the kept output, marking where the middle was dropped."""
+        if not self.dropped:
+            # Contiguous output: decode in one go so a character split across head and tail survives
+            return (self.head + self.tail).decode(errors='replace')
+        
+        text = self.head.decode(errors='replace')
+        text += f"\n... [{self.dropped} bytes truncated] ...\n"
+        return text + self.tail.decode(errors='replace')
+
+
+def _pump(pipes: Dict[int, _CappedBuffer], deadline: float, command: str, timeout: int) -> None:
+    """Read pipes into their buffers as data arrives, until they all reach EOF.
+    
+    Raises:
+        subprocess.TimeoutExpired: If the deadline passes first
+    """
+    with selectors.DefaultSelector() as selector:
+        for fd, buffer in pipes.items():
+            selector.register(fd, selectors.EVENT_READ, buffer)
+        
+        while selector.get_map():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise subprocess.TimeoutExpired(command, timeout)
+            
+            for key, _ in selector.select(remaining):
+                chunk = os.read(key.fd, _PIPE_READ_SIZE)
+                if chunk:
+                    key.data.write(chunk)
+                else:
+                    selector.unregister(key.fd)
+
+
+def _run_command(command: str, shell: bool, timeout: int) -> Tuple[int, str, str]:
+    """Run a command, capturing a bounded amount of its stdout and stderr.
+    
+    Args:
+        command: Command to execute
+        shell: Execute through shell
+        timeout: Maximum execution time in seconds
+    
+    Returns:
+        Tuple of (exit code, stdout, stderr)
+    
+    Raises:
+        subprocess.TimeoutExpired: If the command runs longer than timeout (it is killed)
+    """
+    deadline = time.monotonic() + timeout
+    stdout = _CappedBuffer()
+    stderr = _CappedBuffer()
+    
+    with subprocess.Popen(
+        command,
+        shell=shell,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        bufsize=0
+    ) as process:
+        try:
+            if sys.platform == "win32":
+                # select() doesn't support pipes on Windows
+                out, err = process.communicate(timeout=timeout)
+                stdout.write(out)
+                stderr.write(err)
+            else:
+                _pump(
+                    {process.stdout.fileno(): stdout, process.stderr.fileno(): stderr},
+                    deadline,
+                    command,
+                    timeout
+                )
+                process.wait(timeout=max(deadline - time.monotonic(), 0))
+        except subprocess.TimeoutExpired:
+            process.kill()
+            raise
+    
+    return process.returncode, stdout.getvalue(), stderr.getvalue()
 
 
 @tool
@@ -28,36 +157,30 @@ def execute_shell_command(command: str, timeout: int = 60, shell: bool = True) -
         execute_shell_command("npm test", timeout=120)
     
     Note:
-        - Both stdout and stderr are captured
+        - Both stdout and stderr are captured (first and last MiB of each)
         - Non-zero exit codes are reported but not treated as errors
         - Timeout prevents hanging commands
     """
     try:
-        # Execute command
-        result = subprocess.run(
-            command,
-            shell=shell,
-            capture_output=True,
-            text=True,
-            timeout=timeout
-        )
+        # Execute command (output is read as it comes, very long output is truncated)
+        returncode, stdout, stderr = _run_command(command, shell, timeout)
         
         # Build output
         output = []
         
         # Add stdout if present
-        if result.stdout:
+        if stdout:
             output.append("📤 Output:")
-            output.append(result.stdout.strip())
+            output.append(stdout.strip())
         
         # Add stderr if present
-        if result.stderr:
+        if stderr:
             output.append("\n⚠️ Errors/Warnings:")
-            output.append(result.stderr.strip())
+            output.append(stderr.strip())
         
         # Add exit code
-        if result.returncode != 0:
-            output.append(f"\n❌ Exit code: {result.returncode}")
+        if returncode != 0:
+            output.append(f"\n❌ Exit code: {returncode}")
         else:
             output.append(f"\n✓ Exit code: 0 (success)")
         
@@ -73,6 +196,31 @@ def execute_shell_command(command: str, timeout: int = 60, shell: bool = True) -
         return f"❌ Error executing command: {e}\nCommand: {command}"
 
 
+def _find_repo_root(cwd: str) -> Optional[str]:
+    """Find the git repository containing a directory, without running git.
+    
+    Not cached: a few stat() calls are cheap, and repositories get created,
+    moved and deleted while the session runs.
+    
+    Args:
+        cwd: Absolute directory path
+    
+    Returns:
+        Nearest ancestor (or cwd itself) containing .git, or None
+    """
+    directory = cwd
+    
+    while True:
+        # .git is a file in worktrees and submodules
+        if os.path.exists(os.path.join(directory, ".git")):
+            return directory
+        
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+
 @tool
 def get_current_directory() -> str:
     """Get the current working directory.
@@ -87,29 +235,18 @@ def get_current_directory() -> str:
     try:
         cwd = os.getcwd()
         
-        # Get some additional context
-        try:
-            # Try to get git repo info if in a git repository
-            result = subprocess.run(
-                "git rev-parse --show-toplevel",
-                shell=True,
-                capture_output=True,
-                text=True,
-                timeout=2
-            )
+        # Get some additional context: git repo info if in a git repository
+        repo_root = _find_repo_root(cwd)
+        
+        if repo_root is not None:
+            repo_name = os.path.basename(repo_root)
             
-            if result.returncode == 0:
-                repo_root = result.stdout.strip()
-                repo_name = os.path.basename(repo_root)
-                
-                return f"""📂 Current Directory: {cwd}
+            return f"""📂 Current Directory: {cwd}
 
 🔧 Git Repository: {repo_name}
 📁 Repo Root: {repo_root}"""
-        except:
-            pass
         
-        # Not a git repo or git not available
+        # Not a git repo
         return f"📂 Current Directory: {cwd}"
     
     except Exception as e:
@@ -138,18 +275,16 @@ def change_directory(path: str) -> str:
         # Expand user home directory if present
         path = os.path.expanduser(path)
         
-        # Check if directory exists
-        if not os.path.exists(path):
-            return f"❌ Error: Directory not found: {path}"
-        
-        if not os.path.isdir(path):
-            return f"❌ Error: Not a directory: {path}"
-        
         # Get old directory for reference
         old_dir = os.getcwd()
         
-        # Change directory
-        os.chdir(path)
+        # Change directory (chdir itself reports missing paths and non-directories)
+        try:
+            os.chdir(path)
+        except FileNotFoundError:
+            return f"❌ Error: Directory not found: {path}"
+        except NotADirectoryError:
+            return f"❌ Error: Not a directory: {path}"
         
         # Get new directory
         new_dir = os.getcwd()
@@ -186,35 +321,33 @@ def get_environment_variables(filter_pattern: Optional[str] = None) -> str:
         Shows first 50 variables if no filter provided
     """
     try:
-        env_vars = dict(os.environ)
+        # os.environ is already a mapping, no need to copy it
+        env_vars = os.environ
         
         # Filter if pattern provided
         if filter_pattern:
             pattern_lower = filter_pattern.lower()
-            filtered = {
-                k: v for k, v in env_vars.items()
-                if pattern_lower in k.lower() or pattern_lower in v.lower()
-            }
             
-            if not filtered:
-                return f"ℹ️ No environment variables found matching: {filter_pattern}"
+            # Match and truncate long values in a single pass
+            matches = []
+            for key, value in env_vars.items():
+                if pattern_lower in key.lower() or pattern_lower in value.lower():
+                    matches.append((key, value if len(value) <= 100 else value[:100] + "..."))
             
-            output = [f"🔍 Environment Variables (filtered by '{filter_pattern}'):\n"]
+            if not matches:
+                return f"ℹ️ No environment variables found matching: {filter_pattern}"
             
-            for key in sorted(filtered.keys()):
-                value = filtered[key]
-                # Truncate long values
-                if len(value) > 100:
-                    value = value[:100] + "..."
-                output.append(f"{key}={value}")
+            matches.sort()
             
-            output.append(f"\nTotal: {len(filtered)} variables")
+            output = [f"🔍 Environment Variables (filtered by '{filter_pattern}'):\n"]
+            output.extend(f"{key}={value}" for key, value in matches)
+            output.append(f"\nTotal: {len(matches)} variables")
         
         else:
-            # Show first 50 variables
+            # Show first 50 variables (alphabetically: sort first, then cut)
             output = ["📋 Environment Variables (showing first 50):\n"]
             
-            for key in sorted(list(env_vars.keys())[:50]):
+            for key in itertools.islice(sorted(env_vars), 50):
                 value = env_vars[key]
                 # Truncate long values
                 if len(value) > 100:
@@ -230,6 +363,35 @@ def get_environment_variables(filter_pattern: Optional[str] = None) -> str:
         return f"❌ Error getting environment variables: {e}"
 
 
+@functools.lru_cache(maxsize=1)
+def _os_info() -> str:
+    """Operating system section of get_system_info() (constant, platform.* may shell out)."""
+    return "\n".join([
+        f"\n🖥️  Operating System:",
+        f"   OS: {platform.system()} {platform.release()}",
+        f"   Version: {platform.version()}",
+        f"   Machine: {platform.machine()}",
+        f"   Processor: {platform.processor()}",
+    ])
+
+
+@functools.lru_cache(maxsize=1)
+def _python_info() -> str:
+    """Python section of get_system_info() (constant)."""
+    return "\n".join([
+        f"\n🐍 Python:",
+        f"   Version: {sys.version.split()[0]}",
+        f"   Executable: {sys.executable}",
+        f"   Platform: {sys.platform}",
+    ])
+
+
+@functools.lru_cache(maxsize=1)
+def _cpu_cores() -> str:
+    """CPU core counts line of get_system_info() (constant)."""
+    return f"   Cores: {psutil.cpu_count(logical=False)} physical, {psutil.cpu_count(logical=True)} logical"
+
+
 @tool
 def get_system_info() -> str:
     """Get detailed system information.
@@ -250,26 +412,17 @@ def get_system_info() -> str:
         info.append("💻 System Information\n")
         info.append("=" * 50)
         
-        info.append(f"\n🖥️  Operating System:")
-        info.append(f"   OS: {platform.system()} {platform.release()}")
-        info.append(f"   Version: {platform.version()}")
-        info.append(f"   Machine: {platform.machine()}")
-        info.append(f"   Processor: {platform.processor()}")
+        info.append(_os_info())
         
         # Python Information
-        info.append(f"\n🐍 Python:")
-        info.append(f"   Version: {sys.version.split()[0]}")
-        info.append(f"   Executable: {sys.executable}")
-        info.append(f"   Platform: {sys.platform}")
+        info.append(_python_info())
         
-        # Try to get CPU and Memory info (requires psutil)
-        try:
-            import psutil
-            
-            # CPU
+        # CPU and Memory info (requires psutil)
+        if psutil is not None:
+            # CPU (usage since the previous call, without sleeping to measure it)
             info.append(f"\n⚡ CPU:")
-            info.append(f"   Cores: {psutil.cpu_count(logical=False)} physical, {psutil.cpu_count(logical=True)} logical")
-            info.append(f"   Usage: {psutil.cpu_percent(interval=1)}%")
+            info.append(_cpu_cores())
+            info.append(f"   Usage: {psutil.cpu_percent(interval=None)}%")
             
             # Memory
             memory = psutil.virtual_memory()
@@ -285,7 +438,7 @@ def get_system_info() -> str:
             info.append(f"   Used: {disk.used / (1024**3):.1f} GB ({disk.percent}%)")
             info.append(f"   Free: {disk.free / (1024**3):.1f} GB")
         
-        except ImportError:
+        else:
             info.append("\n💡 Install psutil for detailed CPU/Memory/Disk info:")
             info.append("   pip install psutil")
         
@@ -0,0 +1,59 @@
+"""Test the interactive mode history file."""
+
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from prompt_toolkit.history import FileHistory
+
+from twogiants.cli import _history_writer, _load_history, _trim_history
+
+
+def _entry(i):
+    """One history entry as written by prompt_toolkit's FileHistory."""
+    return f"\n# 2026-01-01 00:00:{i:02d}\n+command {i}\n"
+
+
+def test_trim_history_keeps_whole_recent_entries(tmp_path):
+    history = tmp_path / "history"
+    content = "".join(_entry(i) for i in range(10))
+    history.write_text(content)
+
+    _trim_history(history, max_lines=7)
+
+    trimmed = history.read_text()
+    assert trimmed.startswith("# ")
+    assert content.endswith(trimmed)
+    assert len(trimmed.splitlines()) <= 7
+    # Newest first, as prompt_toolkit reads them back
+    assert list(FileHistory(str(history)).load_history_strings()) == ["command 9", "command 8"]
+
+
+def test_trim_history_leaves_short_file(tmp_path):
+    history = tmp_path / "history"
+    content = _entry(0) + _entry(1)
+    history.write_text(content)
+
+    _trim_history(history, max_lines=100)
+
+    assert history.read_text() == content
+
+
+def test_trim_history_missing_file(tmp_path):
+    _trim_history(tmp_path / "missing", max_lines=10)
+
+    assert not (tmp_path / "missing").exists()
+
+
+def test_load_history_appends_in_background(tmp_path):
+    history_file = tmp_path / "history"
+    history = _load_history(history_file)
+
+    history.append_string("first")
+    history.append_string("second")
+    # Single worker: once this runs, the appends before it are written
+    _history_writer.submit(lambda: None).result()
+
+    assert list(FileHistory(str(history_file)).load_history_strings()) == ["second", "first"]
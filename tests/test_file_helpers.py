@@ -0,0 +1,212 @@
+"""Test file tool edge cases and helpers."""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from twogiants.tools import file_tools
+from twogiants.tools.file_tools import _patch_in_place, edit_file, read_file, write_file
+
+
+@pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="needs named pipes")
+def test_fifo_is_not_a_file(tmp_path):
+    """read_file and edit_file reject a FIFO instead of blocking on open()."""
+    fifo = tmp_path / "pipe"
+    os.mkfifo(fifo)
+
+    assert "is not a file" in read_file.invoke({"filepath": str(fifo)})
+    assert "is not a file" in edit_file.invoke({
+        "filepath": str(fifo),
+        "old_text": "a",
+        "new_text": "b"
+    })
+
+
+
+@pytest.mark.parametrize("data, content, lines", [
+    (b"a\nb\n", "a\nb\n", 2),
+    (b"a\r\nb\r\nc", "a\nb\nc", 3),
+    (b"a\rb\r", "a\nb\n", 2),
+    (b"a\r\n\rb", "a\n\nb", 3),
+    (b"", "", 0),
+])
+def test_read_file_newlines(tmp_path, data, content, lines):
+    """CRLF and CR-only newlines read (and count) like the text-mode read did."""
+    target = tmp_path / "a.txt"
+    target.write_bytes(data)
+
+    result = read_file.invoke({"filepath": str(target)})
+
+    assert result == f"✓ File: {target}\nSize: {len(data)} bytes | Lines: {lines}\n\n{content}"
+
+
+def test_read_file_large(tmp_path):
+    target = tmp_path / "big.log"
+    data = b"line \xc3\xa9\n" * 300_000
+    target.write_bytes(data)
+
+    result = read_file.invoke({"filepath": str(target)})
+
+    assert result.startswith(f"✓ File: {target}\nSize: {len(data)} bytes | Lines: 300000\n\n")
+    assert result.endswith(data.decode("utf-8"))
+
+@pytest.mark.parametrize("data, old, new", [
+    (b"a-b-c", b"-", b"+"),
+    (b"aaaa", b"aa", b"bb"),
+    (b"aaa", b"aa", b"ab"),
+    (b"xyz", b"q", b"r"),
+    (b"", b"a", b"b"),
+    (b"abcabc", b"abc", b"cab"),
+    ("caf\u00e9 caf\u00e9".encode(), "\u00e9".encode(), "\u00e8".encode()),
+])
+def test_patch_in_place_matches_split_join(data, old, new):
+    """Same-length in-place patching gives the same bytes as str.split/join."""
+    assert bytes(_patch_in_place(data, old, new)) == new.join(data.split(old))
+
+
+def test_patch_in_place_leaves_input_untouched():
+    data = b"one two one"
+    _patch_in_place(data, b"one", b"uno")
+    assert data == b"one two one"
+
+
+@pytest.mark.parametrize("filler", [b"x" * 4096, b"x"])
+def test_edit_file_same_length(tmp_path, filler):
+    """Sparse matches (patched in place) and dense ones (split/join) give the same result."""
+    target = tmp_path / "a.txt"
+    target.write_bytes((filler + b"old\n") * 50)
+
+    result = edit_file.invoke({"filepath": str(target), "old_text": "old", "new_text": "new"})
+
+    assert "Replaced 50 occurrence(s)" in result
+    assert target.read_bytes() == (filler + b"new\n") * 50
+
+
+def test_edit_file_backup_keeps_original_bytes(tmp_path):
+    target = tmp_path / "a.txt"
+    target.write_bytes(b"hello\nworld\n")
+
+    result = edit_file.invoke({"filepath": str(target), "old_text": "hello", "new_text": "howdy"})
+
+    assert result.startswith("✓ Edited")
+    assert target.read_bytes() == b"howdy\nworld\n"
+    assert (tmp_path / "a.txt.bak").read_bytes() == b"hello\nworld\n"
+
+
+@pytest.mark.skipif(not hasattr(os, "geteuid") or os.geteuid() == 0, reason="root bypasses file modes")
+def test_edit_file_read_only(tmp_path):
+    """A read-only file in a writable directory is not replaced behind its mode."""
+    target = tmp_path / "a.txt"
+    target.write_text("hello")
+    target.chmod(0o444)
+
+    result = edit_file.invoke({"filepath": str(target), "old_text": "hello", "new_text": "world"})
+
+    assert result == f"❌ Error: Permission denied to edit {target}"
+    assert target.read_text() == "hello"
+    assert not (tmp_path / "a.txt.bak").exists()
+
+
+@pytest.mark.skipif(not hasattr(os, "link"), reason="needs hard links")
+def test_edit_file_keeps_hard_links(tmp_path):
+    target = tmp_path / "a.txt"
+    target.write_text("hello")
+    os.link(target, tmp_path / "b.txt")
+
+    edit_file.invoke({"filepath": str(target), "old_text": "hello", "new_text": "world"})
+
+    assert (tmp_path / "b.txt").read_text() == "world"
+    assert (tmp_path / "a.txt.bak").read_text() == "hello"
+
+
+def test_edit_file_counts_and_replaces_all(tmp_path):
+    target = tmp_path / "a.txt"
+    target.write_text("a = 1\nb = 1\n")
+
+    result = edit_file.invoke({"filepath": str(target), "old_text": "= 1", "new_text": "= 22"})
+
+    assert "Replaced 2 occurrence(s)" in result
+    assert target.read_text() == "a = 22\nb = 22\n"
+
+
+def test_edit_file_text_not_found(tmp_path):
+    target = tmp_path / "a.txt"
+    target.write_text("hello")
+
+    result = edit_file.invoke({"filepath": str(target), "old_text": "bye", "new_text": "x"})
+
+    assert result.startswith(f"❌ Error: Text not found in {target}")
+    assert not (tmp_path / "a.txt.bak").exists()
+
+
+def test_edit_file_rejects_empty_old_text(tmp_path):
+    target = tmp_path / "a.txt"
+    target.write_text("hello")
+
+    result = edit_file.invoke({"filepath": str(target), "old_text": "", "new_text": "x"})
+
+    assert result == "❌ Error: old_text must not be empty"
+    assert target.read_text() == "hello"
+
+
+def test_write_file_refuses_existing(tmp_path):
+    target = tmp_path / "a.txt"
+    target.write_text("keep")
+
+    result = write_file.invoke({"filepath": str(target), "content": "new"})
+
+    assert result.startswith(f"❌ Error: File already exists: {target}")
+    assert target.read_text() == "keep"
+
+    result = write_file.invoke({"filepath": str(target), "content": "new", "overwrite": True})
+
+    assert result == f"✓ Created {target}\nSize: 3 bytes | Lines: 1"
+    assert target.read_text() == "new"
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="needs symlinks")
+def test_write_file_refuses_dangling_symlink(tmp_path):
+    """O_EXCL refuses any existing name, so a planted link can't redirect the write."""
+    link = tmp_path / "a.txt"
+    link.symlink_to(tmp_path / "elsewhere.txt")
+
+    result = write_file.invoke({"filepath": str(link), "content": "new"})
+
+    assert result.startswith("❌ Error: File already exists")
+    assert not (tmp_path / "elsewhere.txt").exists()
+
+
+def test_write_file_creates_missing_parents(tmp_path):
+    target = tmp_path / "x" / "y" / "a.txt"
+
+    result = write_file.invoke({"filepath": str(target), "content": "a\nb"})
+
+    assert result == f"✓ Created {target}\nSize: 3 bytes | Lines: 2"
+    assert target.read_text() == "a\nb"
+
+
+def test_write_file_skips_makedirs_for_existing_parent(tmp_path, monkeypatch):
+    def no_makedirs(*args, **kwargs):
+        raise AssertionError("makedirs called")
+
+    monkeypatch.setattr(file_tools.os, "makedirs", no_makedirs)
+
+    result = write_file.invoke({"filepath": str(tmp_path / "a.txt"), "content": "a"})
+
+    assert result.startswith("✓ Created")
+
+
+def test_write_file_writes_exact_utf8_bytes(tmp_path):
+    """No newline translation or encoding surprises: the file holds content.encode('utf-8')."""
+    target = tmp_path / "a.txt"
+    content = "héllo\nwörld\r\n✓"
+
+    result = write_file.invoke({"filepath": str(target), "content": content})
+
+    assert target.read_bytes() == content.encode("utf-8")
+    assert f"Size: {len(content.encode('utf-8'))} bytes | Lines: 3" in result
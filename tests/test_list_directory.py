@@ -0,0 +1,136 @@
+"""Test list_directory output."""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from twogiants.tools import file_tools
+from twogiants.tools.file_tools import list_directory
+
+
+def _walk_listing(path, show_hidden=False):
+    """Recursive listing as the os.walk() implementation rendered it."""
+    items = [f"📁 Contents of: {os.path.abspath(path)}\n"]
+    for root, dirs, files in os.walk(path):
+        if not show_hidden:
+            dirs[:] = [d for d in dirs if not d.startswith('.')]
+            files = [f for f in files if not f.startswith('.')]
+
+        indent = '  ' * root.replace(path, '').count(os.sep)
+        items.append(f"{indent}📁 {os.path.basename(root)}/")
+        for file in sorted(files):
+            size = os.path.getsize(os.path.join(root, file))
+            items.append(f"{indent}  📄 {file} ({size} bytes)")
+    return "\n".join(items)
+
+
+def _make_tree(root, spec):
+    """Create files (str content) and directories (nested dicts) under root."""
+    root.mkdir(exist_ok=True)
+    for name, content in spec.items():
+        if isinstance(content, dict):
+            _make_tree(root / name, content)
+        else:
+            (root / name).write_text(content)
+
+
+TREE = {
+    "README.md": "readme",
+    ".git": {"HEAD": "ref"},
+    "src": {
+        "pkg": {"__init__.py": "", "mod.py": "x = 1", ".cache": "c"},
+        "main.py": "print()",
+    },
+    "empty": {},
+    "docs": {"a": {"b": {"c": {"deep.txt": "deep"}}}},
+}
+
+
+def test_flat_listing(tmp_path):
+    (tmp_path / "b.txt").write_text("bb")
+    (tmp_path / "a.txt").write_text("a")
+    (tmp_path / ".hidden").write_text("h")
+    (tmp_path / "sub").mkdir()
+
+    result = list_directory.invoke({"path": str(tmp_path)})
+
+    assert result == "\n".join([
+        f"📁 Contents of: {tmp_path}\n",
+        "📁 sub/",
+        "📄 a.txt (1 bytes)",
+        "📄 b.txt (2 bytes)",
+        "\nTotal: 1 directories, 2 files",
+    ])
+
+
+def test_flat_listing_hidden_and_unsorted(tmp_path):
+    (tmp_path / "a.txt").write_text("a")
+    (tmp_path / ".hidden").write_text("h")
+
+    lines = list_directory.invoke({"path": str(tmp_path), "show_hidden": True, "sort": False}).splitlines()
+
+    assert sorted(lines[2:4]) == ["📄 .hidden (1 bytes)", "📄 a.txt (1 bytes)"]
+    assert lines[-1] == "Total: 0 directories, 2 files"
+
+
+def test_recursive_listing_matches_walk(tmp_path):
+    _make_tree(tmp_path, TREE)
+    path = str(tmp_path)
+
+    assert list_directory.invoke({"path": path, "recursive": True}) == _walk_listing(path)
+    assert list_directory.invoke({"path": path, "recursive": True, "show_hidden": True}) == _walk_listing(path, True)
+
+
+def test_recursive_listing_skips_symlinked_directories(tmp_path):
+    _make_tree(tmp_path, TREE)
+    (tmp_path / "link").symlink_to(tmp_path / "src")
+    path = str(tmp_path)
+
+    result = list_directory.invoke({"path": path, "recursive": True})
+
+    assert result == _walk_listing(path)
+    assert "link" not in result
+
+
+def test_recursive_listing_relative_path(tmp_path, monkeypatch):
+    _make_tree(tmp_path, TREE)
+    monkeypatch.chdir(tmp_path)
+
+    assert list_directory.invoke({"path": "src", "recursive": True}) == _walk_listing("src")
+
+
+def test_recursive_listing_wide_tree(tmp_path):
+    """Levels with many directories are scanned in parallel, output order unchanged."""
+    _make_tree(tmp_path, {
+        f"d{i}": {f"e{j}": {"f.txt": "x" * j} for j in range(5)} for i in range(20)
+    })
+    path = str(tmp_path)
+
+    assert list_directory.invoke({"path": path, "recursive": True}) == _walk_listing(path)
+
+
+def test_recursive_listing_chain_stays_inline(tmp_path, monkeypatch):
+    """Single-directory levels never start the thread pool."""
+    _make_tree(tmp_path, {"a": {"b": {"c": {"d.txt": "d"}}}})
+
+    def no_pool(*args, **kwargs):
+        raise AssertionError("thread pool started")
+
+    monkeypatch.setattr(file_tools.concurrent.futures, "ThreadPoolExecutor", no_pool)
+
+    assert list_directory.invoke({"path": str(tmp_path), "recursive": True}) == _walk_listing(str(tmp_path))
+
+
+@pytest.mark.skipif(not hasattr(os, "geteuid") or os.geteuid() == 0, reason="root reads any directory")
+def test_recursive_listing_skips_unreadable(tmp_path):
+    _make_tree(tmp_path, {"open": {"a.txt": "a"}, "closed": {"b.txt": "b"}})
+    (tmp_path / "closed").chmod(0)
+    try:
+        assert list_directory.invoke({"path": str(tmp_path), "recursive": True}) == _walk_listing(str(tmp_path))
+    finally:
+        (tmp_path / "closed").chmod(0o755)
@@ -0,0 +1,110 @@
+"""Test server-side caching of repeated prompt prefixes."""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from twogiants.llm import CACHE_MIN_CHARS, PREFIX_MIN_CHARS, PREFIX_MIN_HITS, PromptPrefixCache
+
+SYSTEM = "s" * CACHE_MIN_CHARS
+SHARED = "word " * (PREFIX_MIN_CHARS // 5 + 20)
+
+
+class FakeLLM:
+    """Records the cached contents PromptPrefixCache asks for (refusing them if fail)."""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.created = []
+
+    async def acreate_cache(self, system_instruction, ttl, prefix):
+        self.created.append((system_instruction, prefix))
+        if self.fail:
+            raise RuntimeError("refused")
+        return f"cachedContents/{len(self.created)}"
+
+    async def adelete_cache(self, name):
+        pass
+
+
+def _cache_with(recent):
+    """Prefix cache (never calling the model) with given recent (system, prompt) pairs."""
+    cache = PromptPrefixCache(llm=None)
+    cache._recent.extend(recent)
+    return cache
+
+
+def test_repeated_prefix_cut_at_word_boundary():
+    cache = _cache_with([(SYSTEM, SHARED + f"question {i}") for i in range(PREFIX_MIN_HITS - 1)])
+
+    prefix = cache._repeated_prefix(SYSTEM, SHARED + "question x")
+
+    assert prefix == SHARED + "question "
+
+
+def test_repeated_prefix_needs_enough_hits():
+    cache = _cache_with([(SYSTEM, SHARED + "question 0")] * (PREFIX_MIN_HITS - 2))
+
+    assert cache._repeated_prefix(SYSTEM, SHARED + "question x") is None
+
+
+def test_repeated_prefix_ignores_other_system_instructions():
+    cache = _cache_with([("other" + SYSTEM, SHARED + f"question {i}") for i in range(PREFIX_MIN_HITS - 1)])
+
+    assert cache._repeated_prefix(SYSTEM, SHARED + "question x") is None
+
+
+def test_repeated_prefix_reaches_model_minimum():
+    """A short system instruction needs a longer prefix to be cacheable."""
+    cache = _cache_with([("short", SHARED + f"question {i}") for i in range(PREFIX_MIN_HITS - 1)])
+
+    assert cache._repeated_prefix("short", SHARED + "question x") is None
+
+
+def test_repeated_prefix_keeps_text_after_prefix():
+    cache = _cache_with([(SYSTEM, SHARED)] * (PREFIX_MIN_HITS - 1))
+
+    assert cache._repeated_prefix(SYSTEM, SHARED) is None
+
+
+def test_repeated_prefix_skips_failed():
+    cache = _cache_with([(SYSTEM, SHARED + f"question {i}") for i in range(PREFIX_MIN_HITS - 1)])
+    cache._failed[(SYSTEM, SHARED + "question ")] = None
+
+    assert cache._repeated_prefix(SYSTEM, SHARED + "question x") is None
+
+
+def test_prepare_caches_then_reuses_prefix():
+    llm = FakeLLM()
+    cache = PromptPrefixCache(llm)
+
+    async def run():
+        return [await cache.prepare(SYSTEM, SHARED + f"question {i}") for i in range(PREFIX_MIN_HITS + 1)]
+
+    results = asyncio.run(run())
+
+    # Full requests until the prefix repeats enough
+    for messages, name in results[:PREFIX_MIN_HITS - 1]:
+        assert name is None
+        assert messages == [("system", SYSTEM), ("user", messages[1][1])]
+
+    # Then only the rest of the prompt is sent, with the same cached content
+    for i, (messages, name) in enumerate(results[PREFIX_MIN_HITS - 1:], PREFIX_MIN_HITS - 1):
+        assert name == "cachedContents/1"
+        assert messages == [("user", f"{i}")]
+    assert llm.created == [(SYSTEM, SHARED + "question ")]
+
+
+def test_prepare_does_not_retry_refused_prefix():
+    llm = FakeLLM(fail=True)
+    cache = PromptPrefixCache(llm)
+
+    async def run():
+        return [await cache.prepare(SYSTEM, SHARED + f"question {i}") for i in range(PREFIX_MIN_HITS + 1)]
+
+    assert all(name is None for _, name in asyncio.run(run()))
+    assert len(llm.created) == 1
+    assert list(cache._failed) == [(SYSTEM, SHARED + "question ")]
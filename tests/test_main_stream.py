@@ -0,0 +1,182 @@
+"""Test TwoGiants.stream routing and speculative answers, with a fake router and model."""
+
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from twogiants.llm import GeminiLLM, PromptPrefixCache
+from twogiants.main import (
+    CONVERSATION_SYSTEM_PROMPT,
+    RESEARCH_FOOTER,
+    RESEARCH_HEADER,
+    RESEARCH_SYSTEM_PROMPT,
+    TwoGiants
+)
+
+
+class FakeRouter:
+    """Answers quick_route() and aclassify() with fixed routes."""
+
+    def __init__(self, quick=None, classified="conversation"):
+        self.quick = quick
+        self.classified = classified
+        self.classify_calls = 0
+
+    def quick_route(self, prompt):
+        return self.quick
+
+    async def aclassify(self, prompt):
+        self.classify_calls += 1
+        await asyncio.sleep(0)
+        return self.classified
+
+    def get_route_description(self, route):
+        return route
+
+
+class FakeLLM:
+    """Streams fixed chunks, recording which streams were opened and closed."""
+
+    def __init__(self, chunks=("Hello", " world"), block=False):
+        self.chunks = chunks
+        self.block = block
+        self.streams = []
+
+    async def astream(self, messages, cached_content=None):
+        record = {"system": messages[0][1], "closed": False}
+        self.streams.append(record)
+        try:
+            if self.block:
+                await asyncio.Event().wait()
+            for chunk in self.chunks:
+                yield chunk
+        finally:
+            record["closed"] = True
+
+
+@pytest.fixture
+def make_giants(monkeypatch):
+    """Build TwoGiants around a fake router and model (no API calls)."""
+    monkeypatch.setenv("GOOGLE_API_KEY", "test")
+
+    def make(router, llm):
+        giants = TwoGiants(use_cache=False)
+        giants.router = router
+        giants.llm = llm
+        giants._prefixes = PromptPrefixCache(llm)
+        return giants
+
+    return make
+
+
+def _collect(giants, prompt="question"):
+    """Run stream() to the end: (chunks, closed state of each model stream right after)."""
+    async def run():
+        chunks = [chunk async for chunk in giants.stream(prompt)]
+        # Checked before the event loop shuts down (which finalizes leftover generators)
+        return chunks, [record["closed"] for record in giants.llm.streams]
+
+    return asyncio.run(run())
+
+
+def test_known_route_skips_speculation(make_giants):
+    router, llm = FakeRouter(quick="conversation"), FakeLLM()
+
+    chunks, closed = _collect(make_giants(router, llm))
+
+    assert chunks == ["Hello", " world"]
+    assert router.classify_calls == 0
+    assert closed == [True]
+
+
+def test_conversation_reuses_speculative_answer(make_giants):
+    router, llm = FakeRouter(classified="conversation"), FakeLLM()
+
+    chunks, closed = _collect(make_giants(router, llm))
+
+    assert chunks == ["Hello", " world"]
+    assert router.classify_calls == 1
+    # The answer started during routing is the one displayed, first chunk included
+    assert closed == [True]
+
+
+def test_executor_discards_speculative_answer(make_giants):
+    llm = FakeLLM()
+
+    chunks, closed = _collect(make_giants(FakeRouter(classified="executor"), llm))
+
+    assert len(chunks) == 1 and chunks[0].startswith("🚧 Executor Agent")
+    assert closed == [True]
+
+
+def test_executor_cancels_pending_first_chunk(make_giants):
+    """A speculative answer still waiting for its first chunk is cancelled, not awaited."""
+    llm = FakeLLM(block=True)
+
+    chunks, closed = _collect(make_giants(FakeRouter(classified="executor"), llm))
+
+    assert chunks[0].startswith("🚧 Executor Agent")
+    assert closed == [True]
+
+
+def test_research_discards_speculative_answer(make_giants):
+    llm = FakeLLM()
+
+    chunks, closed = _collect(make_giants(FakeRouter(classified="research"), llm))
+
+    assert chunks == [RESEARCH_HEADER, "Hello", " world", RESEARCH_FOOTER]
+    assert [stream["system"] for stream in llm.streams] == [CONVERSATION_SYSTEM_PROMPT, RESEARCH_SYSTEM_PROMPT]
+    assert closed == [True, True]
+
+
+@pytest.mark.parametrize("route", ["conversation", "research"])
+def test_stopping_early_closes_model_streams(make_giants, route):
+    """aclose() on stream() reaches the model stream instead of leaving it to GC."""
+    llm = FakeLLM(chunks=("a", "b", "c"))
+    giants = make_giants(FakeRouter(classified=route), llm)
+
+    async def run():
+        stream = giants.stream("question")
+        async for chunk in stream:
+            if chunk == "a":
+                break
+        await stream.aclose()
+        return [record["closed"] for record in llm.streams]
+
+    closed = asyncio.run(run())
+
+    assert closed and all(closed)
+
+
+def test_gemini_astream_closes_sdk_stream():
+    """Closing GeminiLLM.astream() closes the SDK response stream right away."""
+    closed = []
+
+    async def responses():
+        try:
+            for text in ("a", "", "b", "c"):
+                yield SimpleNamespace(text=text)
+        finally:
+            closed.append(True)
+
+    async def generate_content_stream(**kwargs):
+        return responses()
+
+    client = SimpleNamespace(aio=SimpleNamespace(models=SimpleNamespace(
+        generate_content_stream=generate_content_stream
+    )))
+    llm = GeminiLLM(client, model="test", temperature=0.0)
+
+    async def run():
+        stream = llm.astream("prompt")
+        chunks = [await anext(stream), await anext(stream)]
+        await stream.aclose()
+        return chunks, list(closed)
+
+    assert asyncio.run(run()) == (["a", "b"], [True])
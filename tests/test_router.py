@@ -0,0 +1,267 @@
+"""Test RouterAgent classification without calling Gemini."""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from twogiants import llm as llm_module
+from twogiants.agents import router as router_module
+from twogiants.agents.router import PROMPT_CACHE_TTL, ROUTER_INSTRUCTIONS, RouterAgent
+
+
+@pytest.fixture
+def router():
+    """Router with a dummy key and no local models: tests decide what reaches the API."""
+    agent = RouterAgent(api_key="test", use_cache=False)
+    agent._fastpath = None
+    agent._classifier = None
+    return agent
+
+
+@pytest.mark.parametrize("user_input, route", [
+    ("run the tests", "executor"),
+    ("what is the latest news on python", "research"),
+    ("hi there", "conversation"),
+    ("fdsa", None),
+])
+def test_match_keywords(user_input, route):
+    assert RouterAgent._match_keywords(user_input) == route
+
+
+def test_route_obvious_input_skips_gemini(router):
+    router.llm = None  # Any Gemini call would fail and fall back to "conversation"
+
+    assert router.route("run the tests") == "executor"
+    assert router.quick_route("what is the latest news on python") == "research"
+    assert router.quick_route("fdsa") is None
+
+
+class FakeLLM:
+    """Answers every classification with a fixed text."""
+
+    def __init__(self, answer):
+        self.answer = answer
+
+    def invoke(self, messages, cached_content=None):
+        return self.answer
+
+
+@pytest.mark.parametrize("content, route", [
+    ("executor", "executor"),
+    ("EXECUTOR\n", "executor"),
+    ('"research"', "research"),
+    ("**Research.**", "research"),
+    ("  conversation - just chatting", "conversation"),
+    ("`exec`", "executor"),
+])
+def test_parse_response(router, content, route):
+    assert router._parse_response("input", content) == route
+
+
+@pytest.mark.parametrize("content", ["", "maybe", "I think executor"])
+def test_parse_response_defaults_to_conversation(router, content):
+    assert router._parse_response("input", content) == "conversation"
+
+
+def test_route_parses_gemini_answer(router):
+    router.llm = FakeLLM(' "Research."\n')
+
+    assert router.route("fdsa") == "research"
+
+
+class FakeClient:
+    """google-genai client stand-in: records cache creations and generate requests."""
+
+    def __init__(self, answer="research"):
+        self.answer = answer
+        self.created = []
+        self.requests = []
+        self.fail_create = False
+        self.fail_generate = 0
+        self.caches = SimpleNamespace(create=self._create)
+        self.models = SimpleNamespace(generate_content=self._generate)
+        self.aio = SimpleNamespace(
+            caches=SimpleNamespace(create=self._acreate),
+            models=SimpleNamespace(generate_content=self._agenerate)
+        )
+
+    def _create(self, model, config):
+        if self.fail_create:
+            raise RuntimeError("Cached content is too small")
+        self.created.append(config.system_instruction)
+        return SimpleNamespace(name=f"cachedContents/{len(self.created)}")
+
+    async def _acreate(self, model, config):
+        return self._create(model, config)
+
+    def _generate(self, model, contents, config):
+        self.requests.append(config)
+        if self.fail_generate:
+            self.fail_generate -= 1
+            raise RuntimeError("CachedContent not found")
+        return SimpleNamespace(text=self.answer)
+
+    async def _agenerate(self, model, contents, config):
+        return self._generate(model, contents, config)
+
+
+@pytest.fixture
+def make_cached_router(monkeypatch):
+    """Router on a fake client, with instructions as long as the model minimum requires."""
+    def make(client, min_chars=0):
+        monkeypatch.setattr(llm_module, "CACHE_MIN_CHARS", min_chars)
+        agent = RouterAgent(api_key="test", use_cache=False, client=client)
+        agent._fastpath = None
+        agent._classifier = None
+        return agent
+
+    return make
+
+
+def test_instructions_below_minimum_not_cached(make_cached_router):
+    client = FakeClient()
+    router = make_cached_router(client, min_chars=len(ROUTER_INSTRUCTIONS) + 1)
+
+    assert router.route("fdsa") == "research"
+    assert client.created == []
+    assert client.requests[0].cached_content is None
+    assert client.requests[0].system_instruction == ROUTER_INSTRUCTIONS
+
+
+def test_instructions_cached_once_and_reused(make_cached_router):
+    client = FakeClient()
+    router = make_cached_router(client)
+
+    assert router.route("fdsa") == "research"
+    assert router.route("qwerty") == "research"
+
+    assert client.created == [ROUTER_INSTRUCTIONS]
+    for config in client.requests:
+        # The instructions live in the cache, only the prompt is sent
+        assert config.cached_content == "cachedContents/1"
+        assert config.system_instruction is None
+
+
+def test_instructions_cache_refreshed_before_expiry(make_cached_router, monkeypatch):
+    client = FakeClient()
+    router = make_cached_router(client)
+    router.route("fdsa")
+
+    later = time.monotonic() + PROMPT_CACHE_TTL - 30
+    monkeypatch.setattr(router_module, "time", SimpleNamespace(monotonic=lambda: later))
+    router.route("qwerty")
+
+    assert len(client.created) == 2
+    assert client.requests[-1].cached_content == "cachedContents/2"
+
+
+def test_instructions_cache_recreated_after_error(make_cached_router):
+    """A failed request may mean the cache is gone server-side: the next one recreates it."""
+    client = FakeClient()
+    router = make_cached_router(client)
+    router.route("fdsa")
+
+    client.fail_generate = 1
+    assert router.route("qwerty") == "conversation"
+    assert router.route("asdf") == "research"
+
+    assert len(client.created) == 2
+    assert client.requests[-1].cached_content == "cachedContents/2"
+
+
+def test_instructions_cache_disabled_when_refused(make_cached_router):
+    client = FakeClient()
+    client.fail_create = True
+    router = make_cached_router(client)
+
+    assert router.route("fdsa") == "research"
+    client.fail_create = False
+    assert router.route("qwerty") == "research"
+
+    # Not retried, full instructions sent instead
+    assert client.created == []
+    assert all(config.system_instruction == ROUTER_INSTRUCTIONS for config in client.requests)
+
+
+def test_async_classification_shares_instructions_cache(make_cached_router):
+    client = FakeClient()
+    router = make_cached_router(client)
+
+    async def run():
+        return await router.aroute("fdsa"), await router.aclassify_batch(["qwerty", "asdf"])
+
+    assert asyncio.run(run()) == ("research", ["research", "research"])
+    assert client.created == [ROUTER_INSTRUCTIONS]
+    assert all(config.cached_content == "cachedContents/1" for config in client.requests)
+
+
+class RecordingFile:
+    """CACHE_FILE stand-in counting writes (and reading back the last one)."""
+
+    def __init__(self, parent):
+        self.parent = parent
+        self.writes = []
+
+    def read_text(self, encoding=None):
+        if not self.writes:
+            raise FileNotFoundError(self)
+        return self.writes[-1]
+
+    def write_text(self, text, encoding=None):
+        self.writes.append(text)
+
+
+@pytest.fixture
+def cache_file(tmp_path, monkeypatch):
+    recording = RecordingFile(tmp_path)
+    monkeypatch.setattr(router_module, "CACHE_FILE", recording)
+    return recording
+
+
+def _persisting_router(client):
+    agent = RouterAgent(api_key="test", client=client)
+    agent._fastpath = None
+    agent._classifier = None
+    return agent
+
+
+def test_route_cache_persisted_between_runs(cache_file):
+    client = FakeClient()
+    assert _persisting_router(client).route("fdsa") == "research"
+
+    client.answer = "executor"
+    assert _persisting_router(client).quick_route("  FDSA ") == "research"
+    assert len(cache_file.writes) == 1
+
+
+def test_route_cache_invalidated_by_prompt_or_model_change(cache_file, monkeypatch):
+    """Routes persisted for other instructions or another model are not reused."""
+    _persisting_router(FakeClient()).route("fdsa")
+
+    monkeypatch.setattr(router_module, "_CACHE_VERSION", b"other prompt or model")
+
+    assert _persisting_router(FakeClient()).quick_route("fdsa") is None
+
+
+def test_batch_classification_writes_cache_once(cache_file):
+    router = _persisting_router(FakeClient())
+
+    routes = asyncio.run(router.aclassify_batch(["fdsa", "qwerty", "asdf"]))
+
+    assert routes == ["research"] * 3
+    assert len(cache_file.writes) == 1
+    assert all(router.quick_route(text) == "research" for text in ("fdsa", "qwerty", "asdf"))
+
+
+def test_invalid_answer_not_cached(cache_file):
+    router = _persisting_router(FakeClient(answer="maybe"))
+
+    assert router.route("fdsa") == "conversation"
+    assert cache_file.writes == []
@@ -0,0 +1,102 @@
+"""Test shell tool edge cases and helpers."""
+
+import os
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from twogiants.tools.shell_tools import (
+    OUTPUT_HEAD_BYTES,
+    OUTPUT_TAIL_BYTES,
+    _CappedBuffer,
+    execute_shell_command,
+    get_environment_variables
+)
+
+PYTHON = f'"{sys.executable}" -c'
+
+
+def test_capped_buffer_keeps_small_output():
+    buffer = _CappedBuffer(head_size=8, tail_size=8)
+    buffer.write(b"hello ")
+    buffer.write(b"world")
+
+    assert buffer.dropped == 0
+    assert buffer.getvalue() == "hello world"
+
+
+def test_capped_buffer_drops_the_middle():
+    buffer = _CappedBuffer(head_size=4, tail_size=4)
+    for chunk in (b"0123", b"4567", b"89ab", b"cdef"):
+        buffer.write(chunk)
+
+    assert buffer.dropped == 8
+    assert buffer.getvalue() == "0123\n... [8 bytes truncated] ...\ncdef"
+
+
+def test_capped_buffer_keeps_character_across_head_boundary():
+    """A multi-byte character split between head and tail is decoded whole."""
+    buffer = _CappedBuffer(head_size=2, tail_size=8)
+    buffer.write("aéb".encode())
+
+    assert buffer.head == b"a\xc3"
+    assert buffer.getvalue() == "aéb"
+
+
+def test_execute_shell_command_output_and_errors():
+    command = f"{PYTHON} \"import sys; print('out'); print('err', file=sys.stderr); sys.exit(3)\""
+
+    result = execute_shell_command.invoke({"command": command})
+
+    assert result == "📤 Output:\nout\n\n⚠️ Errors/Warnings:\nerr\n\n❌ Exit code: 3"
+
+
+def test_execute_shell_command_truncates_huge_output():
+    size = OUTPUT_HEAD_BYTES + OUTPUT_TAIL_BYTES + 1000
+    command = f"{PYTHON} \"import sys; sys.stdout.write('a' * {OUTPUT_HEAD_BYTES} + 'b' * 1000 + 'c' * {OUTPUT_TAIL_BYTES})\""
+
+    result = execute_shell_command.invoke({"command": command})
+
+    assert len(result) < size
+    assert "\n... [1000 bytes truncated] ...\n" in result
+    assert "b" not in result.replace("bytes truncated", "")
+    assert result.endswith("c\n\n✓ Exit code: 0 (success)")
+
+
+def test_execute_shell_command_timeout():
+    command = f"{PYTHON} \"import time; time.sleep(10)\""
+
+    result = execute_shell_command.invoke({"command": command, "timeout": 1})
+
+    assert result.startswith("❌ Error: Command timed out after 1 seconds")
+
+
+def _set_environment(monkeypatch, variables):
+    """Replace the whole environment, inserting variables in the given order."""
+    for key in list(os.environ):
+        monkeypatch.delenv(key)
+    for key, value in variables:
+        monkeypatch.setenv(key, value)
+
+
+def test_environment_variables_first_50_sorted(monkeypatch):
+    """The listing shows the alphabetically first 50 variables, not the first 50 inserted."""
+    names = [f"VAR_{i:02d}" for i in range(60)]
+    _set_environment(monkeypatch, [(name, "x") for name in reversed(names)])
+
+    lines = get_environment_variables.invoke({}).splitlines()
+
+    assert lines[0] == "📋 Environment Variables (showing first 50):"
+    assert lines[2:52] == [f"{name}=x" for name in names[:50]]
+    assert "VAR_50=x" not in lines
+
+
+def test_environment_variables_filtered(monkeypatch):
+    _set_environment(monkeypatch, [("B_PATH", "b" * 150), ("A_PATH", "a"), ("OTHER", "x"), ("HOME_DIR", "/my/path")])
+
+    lines = get_environment_variables.invoke({"filter_pattern": "path"}).splitlines()
+
+    assert lines[2:5] == ["A_PATH=a", "B_PATH=" + "b" * 100 + "...", "HOME_DIR=/my/path"]
+    assert lines[-1] == "Total: 3 variables"